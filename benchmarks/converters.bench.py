@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from datetime import datetime
+
+from dateutil.parser import parse as parse_datetime
+
+from minibench import Benchmark
+
+from wsgiservice_restplus import converters
+
+VALUES = 100000
+
+FORMS = (
+    '{0:%Y-%m-%dT%H:%M:%S}Z',
+    '{0:%Y-%m-%dT%H:%M:%S}+02:00',
+    '{0:%Y-%m-%dT%H:%M:%S.%f}',
+    '{0:%Y-%m-%d}',
+)
+
+
+def timestamps(count, distinct):
+    '''``count`` timestamps in the canonical ISO 8601 forms, among ``distinct`` values'''
+    return [
+        FORMS[index % len(FORMS)].format(datetime(2017, 1 + index % 12, 1 + index % 28, index % 24, index % 60))
+        for index in (index % distinct for index in range(count))
+    ]
+
+
+class DateTimeConverterBenchmark(Benchmark):
+    '''Conversion of 100k datetime parameters'''
+    times = 3
+
+    def before_class(self):
+        self.distinct = timestamps(VALUES, VALUES)
+        self.repeated = timestamps(VALUES, 100)
+
+    def before(self):
+        converters._datetimes.clear()
+
+    def bench_distinct(self):
+        for value in self.distinct:
+            converters.DateTime(value)
+
+    def bench_distinct_dateutil(self):
+        for value in self.distinct:
+            parse_datetime(value)
+
+    def bench_repeated(self):
+        for value in self.repeated:
+            converters.DateTime(value)
+
+    def bench_repeated_dateutil(self):
+        for value in self.repeated:
+            parse_datetime(value)
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from decimal import Decimal, ROUND_HALF_EVEN
+
+from minibench import Benchmark
+from six import text_type
+
+from wsgiservice_restplus import fields
+
+VALUES = 100000
+
+PRECISION = Decimal('0.01')
+ZERO = Decimal()
+
+
+def quantize(value):
+    '''The former Fixed(decimals=2).format: a quantized Decimal for every value'''
+    dvalue = Decimal(value)
+    if not dvalue.is_normal() and dvalue != ZERO:
+        raise ValueError('Invalid Fixed precision number.')
+    return text_type(dvalue.quantize(PRECISION, rounding=ROUND_HALF_EVEN))
+
+
+class FixedBenchmark(Benchmark):
+    '''Formatting of 100k amounts with a Fixed(decimals=2) field'''
+    times = 5
+
+    def before_class(self):
+        self.field = fields.Fixed(decimals=2)
+        self.number_field = fields.Fixed(decimals=2, as_number=True)
+        self.floats = [index * 1.37 for index in range(VALUES)]
+        self.integers = list(range(VALUES))
+        self.decimals = [Decimal(index).scaleb(-2) for index in range(VALUES)]
+
+    def bench_floats(self):
+        self.field.format_many(self.floats)
+
+    def bench_floats_quantized(self):
+        list(map(quantize, self.floats))
+
+    def bench_floats_as_numbers(self):
+        self.number_field.format_many(self.floats)
+
+    def bench_integers(self):
+        self.field.format_many(self.integers)
+
+    def bench_integers_quantized(self):
+        list(map(quantize, self.integers))
+
+    def bench_decimals(self):
+        self.field.format_many(self.decimals)
+
+    def bench_decimals_quantized(self):
+        list(map(quantize, self.decimals))
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from datetime import datetime
+
+from minibench import Benchmark
+from six import iteritems
+
+from wsgiservice_restplus import Model, fields, marshal
+from wsgiservice_restplus.fields import instance
+from wsgiservice_restplus.marshalling import compile_plan
+
+ROWS = 10000
+REPORT_ROWS = 50000
+FEED_ITEMS = 50000
+
+address = Model('Address', {
+    'street': fields.String,
+    'city': fields.String,
+    'zip': fields.Integer,
+})
+
+person = Model('Person', {
+    'id': fields.Integer,
+    'name': fields.String,
+    'email': fields.String(attribute='contact.email'),
+    'born': fields.DateTime,
+    'score': fields.Float,
+    'active': fields.Boolean,
+    'address': fields.Nested(address),
+    'tags': fields.List(fields.String),
+})
+
+entry = Model('Entry', {
+    'id': fields.Integer,
+    'booked': fields.DateTime,
+    'amount': fields.Fixed(decimals=2),
+    'rate': fields.Float,
+})
+
+report = Model('Report', {
+    'entries': fields.List(fields.Nested(entry)),
+})
+
+activity = Model('Activity', {
+    'kind': fields.String(discriminator=True),
+    'id': fields.Integer,
+    'created': fields.DateTime,
+})
+post_activity = activity.inherit('PostActivity', activity, {'title': fields.String})
+like_activity = activity.inherit('LikeActivity', activity, {'count': fields.Integer})
+
+
+class Activity(object):
+    def __init__(self, index):
+        self.id = index
+        self.created = datetime(2017, 1, 1 + index % 28)
+
+
+class PostActivity(Activity):
+    title = 'Hello'
+
+
+class LikeActivity(Activity):
+    count = 3
+
+
+class PinnedPostActivity(PostActivity):
+    '''Marshalled with the PostActivity model (nearest mapped class)'''
+
+
+ACTIVITIES = (PostActivity, LikeActivity, PinnedPostActivity)
+
+activity_field = fields.Polymorph({PostActivity: post_activity, LikeActivity: like_activity})
+
+feed = Model('Feed', {
+    'items': fields.List(activity_field),
+})
+
+
+def row(index):
+    return {
+        'id': index,
+        'name': 'Person {0}'.format(index),
+        'contact': {'email': 'person{0}@example.com'.format(index)},
+        'born': datetime(1980, 1, 1 + index % 28),
+        'score': index / 3.0,
+        'active': index % 2 == 0,
+        'address': {'street': '{0} Main street'.format(index), 'city': 'Zurich', 'zip': 8000 + index % 100},
+        'tags': ['a', 'b'],
+    }
+
+
+def naive_marshal(data, model):
+    '''A per field get_value/format loop (the uncompiled path)'''
+    model = model.resolved
+    return [
+        dict((name, instance(field).output(name, item)) for name, field in iteritems(model))
+        for item in data
+    ]
+
+
+class MarshallingBenchmark(Benchmark):
+    '''Marshalling of a 10k rows list'''
+    times = 5
+
+    def before_class(self):
+        self.rows = [row(index) for index in range(ROWS)]
+
+    def bench_compiled_plan(self):
+        marshal(self.rows, person)
+
+    def bench_naive_loop(self):
+        naive_marshal(self.rows, person)
+
+
+class ReportBenchmark(Benchmark):
+    '''Marshalling of a report holding a 50k entries list'''
+    times = 5
+
+    def before_class(self):
+        self.report = {
+            'entries': [
+                {'id': index, 'booked': datetime(2017, 1, 1 + index % 28, index % 24),
+                 'amount': index * 1.25, 'rate': index / 7.0}
+                for index in range(REPORT_ROWS)
+            ]
+        }
+        self.entry_plan = compile_plan(entry)
+
+    def bench_columnar(self):
+        marshal(self.report, report)
+
+    def bench_row_by_row(self):
+        {'entries': [self.entry_plan(item) for item in self.report['entries']]}
+
+
+class PolymorphBenchmark(Benchmark):
+    '''Marshalling of a 50k heterogeneous items feed'''
+    times = 5
+
+    def before_class(self):
+        self.feed = {'items': [ACTIVITIES[index % 3](index) for index in range(FEED_ITEMS)]}
+
+    def bench_compiled_plan(self):
+        marshal(self.feed, feed)
+
+    def bench_field_output(self):
+        [activity_field.output(index, self.feed['items']) for index in range(FEED_ITEMS)]
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function, unicode_literals
+
+import gc
+
+from copy import deepcopy
+
+from minibench import Benchmark
+
+from wsgiservice_restplus import Model, fields
+
+try:
+    import tracemalloc
+except ImportError:  # Python 2
+    tracemalloc = None
+
+MODELS = 2000
+
+
+def build_models(count=MODELS):
+    '''A synthetic API: ``count`` models of the usual field types'''
+    models = []
+    for index in range(count):
+        address = Model('Address{0}'.format(index), {
+            'street': fields.String(min_length=1, max_length=128),
+            'city': fields.String(description='The city name'),
+            'zip': fields.Integer(min=1000, max=9999),
+        })
+        models.append(address)
+        models.append(Model('Person{0}'.format(index), {
+            'id': fields.Integer(description='The person identifier', readonly=True),
+            'name': fields.String(min_length=2, pattern=r'\w+'),
+            'born': fields.DateTime,
+            'score': fields.Float(min=0),
+            'balance': fields.Fixed(decimals=2),
+            'active': fields.Boolean(default=True),
+            'address': fields.Nested(address, allow_null=True),
+            'tags': fields.List(fields.String, max_items=10),
+        }))
+    return models
+
+
+def allocated(func):
+    '''The memory (in bytes) allocated by ``func`` and still held by its result'''
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = func()  # noqa: F841 (keep the result alive while measuring)
+        gc.collect()
+        return tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+
+class FieldsMemoryBenchmark(Benchmark):
+    '''Building and cloning the fields of a synthetic 2,000 models API'''
+    times = 5
+
+    def before_class(self):
+        self.models = build_models()
+
+    def bench_build_models(self):
+        build_models()
+
+    def bench_deepcopy_models(self):
+        deepcopy(self.models)
+
+
+if __name__ == '__main__':
+    if tracemalloc is None:
+        raise SystemExit('tracemalloc is required to measure the memory use')
+    print('{0} models: {1:.0f} KiB'.format(MODELS, allocated(build_models) / 1024.))
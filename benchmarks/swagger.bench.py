@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from contextlib import contextmanager
+from copy import deepcopy
+
+from minibench import Benchmark
+from six import iteritems
+from wsgiservice import Resource
+
+from wsgiservice_restplus import Api, Swagger, fields, swagger
+from wsgiservice_restplus.namespace import Namespace
+
+RESOURCES = 500
+RESOURCES_BY_NAMESPACE = 25
+
+
+def deepcopy_merge(first, second):
+    '''The former :func:`~wsgiservice_restplus.utils.merge`, deep copying both dictionnaries'''
+    if not isinstance(second, dict):
+        return second
+    result = deepcopy(first)
+    for key, value in iteritems(second):
+        if key in result and isinstance(result[key], dict):
+            result[key] = deepcopy_merge(result[key], value)
+        else:
+            result[key] = deepcopy(value)
+    return result
+
+
+@contextmanager
+def merge_implementation(implementation):
+    original = swagger.merge
+    swagger.merge = implementation
+    try:
+        yield
+    finally:
+        swagger.merge = original
+
+
+def build_resource(ns, index, model):
+
+    @ns.param('page', 'The page number', type=int)
+    @ns.route('/resource{0}/{{id}}'.format(index), public=True)
+    class Item(Resource):
+
+        @ns.doc('get_item_{0}'.format(index))
+        @ns.response(404, 'Item not found')
+        @ns.marshal_with(model)
+        def GET(self, id):
+            '''Fetch an item given its identifier'''
+
+        @ns.expect(model)
+        @ns.marshal_with(model, code=201)
+        def PUT(self, id):
+            '''Replace an item given its identifier'''
+
+    Item.__name__ = str('Item{0}'.format(index))
+    return Item
+
+
+def build_api(resources=RESOURCES):
+    api = Api(title='Benchmark', authorizations={})
+    for start in range(0, resources, RESOURCES_BY_NAMESPACE):
+        ns = Namespace('ns{0}'.format(start), path='/ns{0}'.format(start), public=True)
+        model = ns.model('Item{0}'.format(start), {
+            'id': fields.Integer(description='The identifier'),
+            'name': fields.String(description='The name', min_length=1),
+            'tags': fields.List(fields.String),
+        })
+        for index in range(start, min(start + RESOURCES_BY_NAMESPACE, resources)):
+            build_resource(ns, index, model)
+        api.add_namespace(ns)
+    return api
+
+
+class SwaggerBuildBenchmark(Benchmark):
+    '''Swagger specification build of a 500 resources API'''
+    times = 20
+
+    def before_class(self):
+        self.api = build_api()
+
+    def bench_structural_sharing_merge(self):
+        Swagger(self.api).as_dict()
+
+    def bench_deepcopy_merge(self):
+        with merge_implementation(deepcopy_merge):
+            Swagger(self.api).as_dict()
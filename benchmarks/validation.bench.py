@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from jsonschema import Draft4Validator
+from minibench import Benchmark
+
+from wsgiservice_restplus import Model, fields
+from wsgiservice_restplus.validation import compile_validator
+
+# The examples/general/simple.py post model
+post_model = Model('post_model', {
+    'title': fields.String(pattern=r'[-0-9a-zA-Z]{36}', description='Title of the post', example='Welcome!'),
+    'text': fields.String(pattern=r'[-0-9a-zA-Z]', description='Text content of the post'),
+    'locked': fields.Boolean(description='Boolean switch, makes a post locked for comments.'),
+    'sticky': fields.Boolean(description='Boolean switch, makes a post pinned to the top of the stream.'),
+    'id': fields.Integer(description='Unique index integer number'),
+})
+
+# The same model validated with the validators generated as Python source
+compiled_post_model = Model('post_model', post_model)
+compiled_post_model.validator_engine = 'compiled'
+
+POST = {
+    'id': 0,
+    'title': '2f0e4a9c-7d0b-4d8e-9a57-1c3f6b9e2d40',
+    'text': 'Welcome to the Beekeeper!',
+    'sticky': True,
+    'locked': False,
+}
+
+
+class ValidationBenchmark(Benchmark):
+    '''Validation of a payload against the example post_model'''
+    times = 10000
+
+    def bench_payload_validator(self):
+        compile_validator(post_model)(POST)
+
+    def bench_compiled_validator(self):
+        post_model.validate(POST)
+
+    def bench_compiled_engine(self):
+        compiled_post_model.validate(POST)
+
+    def bench_validator_per_call(self):
+        # Former Model.validate behavior: a validator built from a recomputed schema on each call
+        post_model._touch()
+        Draft4Validator(post_model.__schema__).validate(POST)
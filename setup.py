@@ -22,7 +22,7 @@ dependency_links=[
     "https://github.com/beekpr/wsgiservice/archive/0.5.0.zip#egg=wsgiservice"
 ]
 
-tests_require = ['nose', 'rednose', 'blinker', 'tzlocal']
+tests_require = ['pytest', 'nose', 'rednose', 'blinker', 'tzlocal']
 dev_requires = ['minibench', 'tox', 'invoke'] + tests_require
 
 
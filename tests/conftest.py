@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import pytest
+import webob
+
+from wsgiservice_restplus import Api
+from wsgiservice_restplus.namespace import Namespace
+
+
+@pytest.fixture
+def api():
+    return Api(version='1.0', title='Test API')
+
+
+@pytest.fixture
+def ns():
+    return Namespace('items', path='/', public=True)
+
+
+@pytest.fixture
+def client(api):
+    '''Build the API application (once its resources are declared) and send it requests'''
+    state = {}
+
+    def request(path, **kwargs):
+        if 'app' not in state:
+            state['app'] = api.create_wsgiservice_app()
+        headers = kwargs.setdefault('headers', {})
+        headers.setdefault('Accept', 'application/json')
+        return webob.Request.blank(path, **kwargs).get_response(state['app'])
+
+    return request
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from datetime import datetime
+
+import pytest
+
+from dateutil.parser import parse as parse_datetime
+
+from wsgiservice_restplus import converters
+
+
+class TestDateTime(object):
+    @pytest.mark.parametrize('value', [
+        '2011-01-01',
+        '2011-01-01T23:59:59',
+        '2011-01-01T23:59:59.123456',
+        '2011-01-01T23:59:59Z',
+        '2011-01-01T23:59:59+02:00',
+        '2011-01-01T23:59:59-0530',
+        '2011-01-01 23:59:59',
+        'Sat, 01 Jan 2011 23:59:59 GMT',
+    ])
+    def test_same_as_dateutil(self, value):
+        converted = converters.DateTime(value)
+        expected = parse_datetime(value)
+
+        assert converted == expected
+        assert converted.utcoffset() == expected.utcoffset()
+
+    def test_cached(self):
+        value = '2016-05-04T03:02:01Z'
+
+        assert converters.DateTime(value) is converters.DateTime(value)
+
+    @pytest.mark.parametrize('value', ['10:00', 'Monday', 'Sat, 01 Jan 2011 23:59:59 GMT'])
+    def test_dateutil_values_not_cached(self, value):
+        converters.DateTime(value)
+
+        assert converters._datetimes.get(value) is None
+
+    def test_not_a_string(self):
+        with pytest.raises((TypeError, AttributeError)):
+            converters.DateTime(datetime(2011, 1, 1))
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            converters.DateTime('not a date')
@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import copy
+import pickle
+
+from collections import namedtuple
+from decimal import Decimal
+
+import pytest
+
+from six import text_type
+
+from wsgiservice_restplus import fields, marshal
+from wsgiservice_restplus.model import Model
+
+Point = namedtuple('Point', 'x y')
+
+
+class Obj(object):
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+class TestGetValue(object):
+    def test_dict(self):
+        assert fields.get_value('a', {'a': 1}) == 1
+        assert fields.get_value('b', {'a': 1}) is None
+        assert fields.get_value('b', {'a': 1}, default=2) == 2
+
+    def test_object(self):
+        assert fields.get_value('a', Obj(a=1)) == 1
+        assert fields.get_value('b', Obj(a=1), default=2) == 2
+
+    def test_dotted(self):
+        data = {'a': Obj(b={'c': 3})}
+
+        assert fields.get_value('a.b.c', data) == 3
+        assert fields.get_value('a.x.c', data) is None
+
+    def test_index(self):
+        assert fields.get_value(1, ['a', 'b']) == 'b'
+        assert fields.get_value('x', Point(1, 2)) == 1
+
+    def test_callable(self):
+        assert fields.get_value(lambda obj: obj['a'] * 2, {'a': 2}) == 4
+
+    def test_compiled_once(self):
+        assert fields.compile_accessor('a.b') is fields.compile_accessor('a.b')
+
+
+class TestSlots(object):
+    def test_no_instance_dict(self):
+        for cls in (fields.Raw, fields.String, fields.Integer, fields.Float, fields.Fixed, fields.Boolean,
+                    fields.DateTime, fields.Date, fields.Url, fields.ClassName):
+            assert not hasattr(cls(), '__dict__'), cls
+
+        assert not hasattr(fields.List(fields.String), '__dict__')
+        assert not hasattr(fields.Nested({'a': fields.String}), '__dict__')
+
+    def test_valid_params(self):
+        field = fields.String(re='[a-z]+', convert=str, mandatory=True, description='A name')
+
+        assert dict(field.valid_params) == {'re': '[a-z]+', 'convert': str, 'doc': 'A name', 'mandatory': True}
+        field.valid_params['mandatory'] = False
+        assert field.valid_params['mandatory'] is False
+        with pytest.raises(KeyError):
+            field.valid_params['unknown'] = 1
+
+    def test_copy(self):
+        field = fields.String(description='A name', min_length=1)
+        field.__schema__
+
+        for clone in (copy.copy(field), copy.deepcopy(field), pickle.loads(pickle.dumps(field))):
+            assert clone.description == 'A name'
+            assert clone.min_length == 1
+            assert clone._schema_cache is None
+            assert clone.__schema__ == field.__schema__
+
+    def test_subclass_without_slots(self):
+        class Custom(fields.String):
+            def __init__(self, **kwargs):
+                self.custom = 'value'
+                super(Custom, self).__init__(**kwargs)
+
+        field = Custom(description='A name')
+        clone = copy.deepcopy(field)
+
+        assert clone.custom == 'value'
+        assert clone.description == 'A name'
+
+
+NUMBERS = [0, 1, -1, 7, 10 ** 12, -(10 ** 20), 0.5, 1.005, -2.675, 3.14159265, 1e-7, 123456.789, 1e15,
+           Decimal('0'), Decimal('1.10'), Decimal('-3.14159'), Decimal('1E+3'), Decimal('2.50000'),
+           Decimal('0.000001'), '4.5', '1e2']
+
+
+def outcome(func, value):
+    '''The result of a call or the type of the exception it raised'''
+    try:
+        return func(value)
+    except Exception as e:
+        return type(e)
+
+
+class TestFixed(object):
+    @pytest.mark.parametrize('decimals', [1, 2, 5, 6, 8])
+    def test_same_as_quantize(self, decimals):
+        field = fields.Fixed(decimals=decimals)
+
+        for value in NUMBERS:
+            assert outcome(field.format, value) == outcome(field.quantize, value), value
+
+    def test_rounding(self):
+        assert fields.Fixed(decimals=2).format(Decimal('2.675')) == '2.68'
+        assert fields.Fixed(decimals=2).format(Decimal('2.665')) == '2.66'
+        assert fields.Fixed(decimals=2).format(2) == '2.00'
+
+    def test_invalid(self):
+        for value in (float('nan'), float('inf'), Decimal('NaN')):
+            with pytest.raises(fields.MarshallingError):
+                fields.Fixed().format(value)
+
+    def test_as_number(self):
+        field = fields.Fixed(decimals=2, as_number=True)
+
+        assert field.format(Decimal('3.14159')) == 3.14
+        assert field.format(10 ** 20) == '100000000000000000000.00'
+
+    def test_format_many(self):
+        field = fields.Fixed(decimals=3)
+
+        assert field.format_many(NUMBERS) == [field.format(value) for value in NUMBERS]
+
+
+class TestArbitrary(object):
+    def test_same_as_decimal(self):
+        field = fields.Arbitrary()
+
+        for value in NUMBERS:
+            assert field.format(value) == text_type(Decimal(value)), value
+
+    def test_as_number(self):
+        field = fields.Arbitrary(as_number=True)
+
+        assert field.format(3) == 3
+        assert field.format(2 ** 60) == text_type(2 ** 60)
+        assert field.format(0.5) == 0.5
+        assert field.format(Decimal('1.25')) == 1.25
+        assert field.format(Decimal('1.2345678901234567')) == '1.2345678901234567'
+
+    def test_as_number_not_finite(self):
+        field = fields.Arbitrary(as_number=True)
+
+        assert field.format(float('nan')) == 'NaN'
+        assert field.format(float('inf')) == 'Infinity'
+        assert field.format(float('-inf')) == '-Infinity'
+
+    def test_format_many(self):
+        field = fields.Arbitrary()
+
+        assert field.format_many(NUMBERS) == [field.format(value) for value in NUMBERS]
+
+
+class Owner(object):
+    def __init__(self, name):
+        self.name = name
+
+
+class Person(Owner):
+    pass
+
+
+class Employee(Person):
+    def __init__(self, name, company):
+        super(Employee, self).__init__(name)
+        self.company = company
+
+
+class Company(Owner):
+    pass
+
+
+class TestPolymorph(object):
+    def models(self):
+        owner = Model('Owner', {'name': fields.String})
+        person = owner.inherit('Person', {})
+        employee = person.inherit('Employee', {'company': fields.String})
+        company = owner.inherit('Company', {'kind': fields.String(default='company')})
+        return owner, person, employee, company
+
+    def test_dispatch(self):
+        owner, person, employee, company = self.models()
+        model = Model('Thing', {'owner': fields.Polymorph({Person: person, Employee: employee, Company: company})})
+
+        assert marshal({'owner': Employee('John', 'ACME')}, model) == {'owner': {'name': 'John', 'company': 'ACME'}}
+        assert marshal({'owner': Company('ACME')}, model) == {'owner': {'name': 'ACME', 'kind': 'company'}}
+
+    def test_nearest_base_class(self):
+        owner, person, employee, company = self.models()
+        field = fields.Polymorph({Person: person, Company: company})
+
+        assert field.model_for(Employee) is person
+        assert field.model_for(Employee) is person
+
+    def test_unknown_class(self):
+        owner, person, employee, company = self.models()
+        field = fields.Polymorph({Person: person, Company: company})
+
+        with pytest.raises(fields.MarshallingError):
+            field.model_for(Owner)
+
+    def test_dispatch_reset_on_change(self):
+        owner, person, employee, company = self.models()
+        field = fields.Polymorph({Person: person, Company: company})
+        assert field.model_for(Employee) is person
+
+        field.mapping = {Person: person, Employee: employee, Company: company}
+
+        assert field.model_for(Employee) is employee
+
+    def test_ancestors(self):
+        owner, person, employee, company = self.models()
+
+        assert employee.ancestors == frozenset(['Owner', 'Person', 'Employee'])
+        assert employee.ancestors is employee.ancestors
+        with pytest.raises(ValueError):
+            fields.Polymorph({Person: person, Company: Model('Other', {})})
@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import json
+
+import pytest
+
+from wsgiservice import Resource
+
+from wsgiservice_restplus import fields, marshal
+from wsgiservice_restplus.fields import NUMPY_THRESHOLD
+from wsgiservice_restplus.marshalling import COLUMNAR_THRESHOLD, compile_plan, stream
+from wsgiservice_restplus.model import Model
+from wsgiservice_restplus.utils import getargspec
+
+
+def person():
+    return Model('Person', {
+        'name': fields.String,
+        'age': fields.Integer(default=18),
+        'city': fields.String(attribute='address.city'),
+    })
+
+
+class TestMarshal(object):
+    def test_dict(self):
+        data = {'name': 'John', 'age': 42, 'address': {'city': 'Paris'}, 'secret': 'x'}
+
+        assert marshal(data, person()) == {'name': 'John', 'age': 42, 'city': 'Paris'}
+
+    def test_object_and_defaults(self):
+        class Obj(object):
+            name = 'John'
+            address = None
+
+        assert marshal(Obj(), person()) == {'name': 'John', 'age': 18, 'city': None}
+
+    def test_list(self):
+        data = [{'name': 'John'}, {'name': 'Jane', 'age': 3}]
+
+        assert marshal(data, person()) == [
+            {'name': 'John', 'age': 18, 'city': None},
+            {'name': 'Jane', 'age': 3, 'city': None},
+        ]
+
+    def test_dict_of_fields(self):
+        assert marshal({'a': '1', 'b': 2}, {'a': fields.Integer}) == {'a': 1}
+
+    def test_nested(self):
+        model = Model('Parent', {'child': fields.Nested(person()), 'points': fields.List(fields.Integer)})
+        data = {'child': {'name': 'John'}, 'points': ['1', 2]}
+
+        assert marshal(data, model) == {'child': {'name': 'John', 'age': 18, 'city': None}, 'points': [1, 2]}
+
+    def test_nested_allow_null(self):
+        model = Model('Parent', {'child': fields.Nested(person(), allow_null=True)})
+
+        assert marshal({'child': None}, model) == {'child': None}
+
+
+class TestCompilePlan(object):
+    def test_cached(self):
+        model = person()
+
+        assert compile_plan(model) is compile_plan(model)
+
+    def test_invalidated_by_mutation(self):
+        model = person()
+        plan = compile_plan(model)
+        model['email'] = fields.String
+
+        assert compile_plan(model) is not plan
+        assert 'email' in marshal({}, model)
+
+    def test_invalidated_by_nested_mutation(self):
+        child = person()
+        model = Model('Parent', {'child': fields.Nested(child)})
+        marshal({'child': {}}, model)
+        child['email'] = fields.String
+
+        assert 'email' in marshal({'child': {}}, model)['child']
+
+    def test_list_container_attribute(self):
+        class Tag(object):
+            name = 'b'
+
+        tags = fields.List(fields.String(attribute='name'))
+        value = [{'name': 'a'}, Tag(), 'c']
+
+        assert marshal({'tags': value}, {'tags': tags}) == {'tags': tags.format(value)}
+        assert marshal({'tags': value}, {'tags': tags}) == {'tags': ['a', 'b', None]}
+
+
+class TestMarshalWith(object):
+    def test_marshalled(self, api, ns, client):
+        model = ns.model('Person', person())
+
+        @ns.route('/people', public=True)
+        class People(Resource):
+            @ns.marshal_list_with(model)
+            def GET(self):
+                return [{'name': 'John', 'password': 'secret'}]
+
+        @ns.route('/people/{name}', public=True)
+        class Someone(Resource):
+            @ns.marshal_with(model)
+            def GET(self, name):
+                return {'name': name} if name != 'nobody' else None
+
+        api.add_namespace(ns)
+
+        assert json.loads(client('/people').body.decode('utf-8')) == [{'name': 'John', 'age': 18, 'city': None}]
+        assert json.loads(client('/people/Jane').body.decode('utf-8'))['name'] == 'Jane'
+        assert client('/people/nobody').body == b''
+
+    def test_signature_kept(self, ns):
+        class People(Resource):
+            @ns.marshal_with(person())
+            def GET(self, name, limit=10):
+                return {}
+
+        assert getargspec(People.GET).args == ['self', 'name', 'limit']
+        assert getargspec(People.GET).defaults == (10,)
+
+
+class TestStream(object):
+    def test_chunks(self):
+        data = [{'name': str(i)} for i in range(1000)]
+        chunks = list(stream(iter(data), {'name': fields.String}, chunk_size=100))
+
+        assert len(chunks) > 1
+        assert all(isinstance(chunk, bytes) for chunk in chunks)
+        assert json.loads(b''.join(chunks).decode('utf-8')) == data
+
+    def test_empty(self):
+        assert b''.join(stream(iter([]), person())) == b'[]'
+
+    def test_streamed_response(self, api, ns, client):
+        model = ns.model('Person', person())
+        count = 10000
+        fetched = []
+
+        def people():
+            for i in range(count):
+                fetched.append(i)
+                yield {'name': str(i), 'age': i}
+
+        @ns.route('/people', public=True)
+        class People(Resource):
+            @ns.marshal_list_with(model, stream=True)
+            def GET(self):
+                return people()
+
+        api.add_namespace(ns)
+        response = client('/people')
+
+        assert response.status_int == 200
+        assert response.content_type == 'application/json'
+        assert 'Content-MD5' not in response.headers
+        assert fetched == []
+
+        chunks = iter(response.app_iter)
+        first = next(chunks)
+        assert 0 < len(fetched) < count
+
+        body = first + b''.join(chunks)
+        assert len(fetched) == count
+        assert json.loads(body.decode('utf-8')) == [{'name': str(i), 'age': i, 'city': None} for i in range(count)]
+
+    def test_only_lists(self, ns):
+        with pytest.raises(ValueError):
+            ns.marshal_with(person(), stream=True)(lambda self: None)
+
+
+class TestColumnar(object):
+    def model(self):
+        return Model('Row', {
+            'name': fields.String,
+            'count': fields.Integer(default=0),
+            'ratio': fields.Float,
+            'price': fields.Fixed(decimals=2),
+            'active': fields.Boolean,
+            'tags': fields.List(fields.String),
+            'child': fields.Nested({'id': fields.Integer}, allow_null=True),
+        })
+
+    def rows(self, count):
+        return [{
+            'name': 'row{0}'.format(i) if i % 7 else None,
+            'count': i if i % 5 else None,
+            'ratio': i / 3.0,
+            'price': i / 7.0,
+            'active': i % 2,
+            'tags': ['a', i],
+            'child': {'id': str(i)} if i % 3 else None,
+        } for i in range(count)]
+
+    def test_same_as_row_by_row(self):
+        model = self.model()
+        rows = self.rows(COLUMNAR_THRESHOLD * 4)
+        plan = compile_plan(model)
+
+        assert plan.many(rows) == [plan(row) for row in rows]
+        assert marshal(rows, model) == [plan(row) for row in rows]
+
+    def test_format_many(self):
+        values = [1, 2.5, '3', 4]
+        for field in (fields.Integer(), fields.Float(), fields.Fixed(decimals=1), fields.Boolean(), fields.String()):
+            assert field.format_many(values) == [field.format(value) for value in values], field
+
+    def test_numpy_threshold(self):
+        values = [i / 3.0 for i in range(NUMPY_THRESHOLD * 2)]
+
+        assert fields.Float().format_many(values) == [fields.Float().format(value) for value in values]
+
+    def test_iterable(self):
+        rows = self.rows(COLUMNAR_THRESHOLD * 2)
+        plan = compile_plan(self.model())
+
+        assert plan.many(iter(rows)) == plan.many(rows)
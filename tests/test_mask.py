@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import json
+
+import pytest
+
+from wsgiservice import Resource
+
+from wsgiservice_restplus import fields, mask, marshal
+from wsgiservice_restplus.model import Model
+
+
+def person():
+    return Model('Person', {
+        'name': fields.String,
+        'age': fields.Integer,
+        'address': fields.Nested(Model('Address', {'city': fields.String, 'zip': fields.String})),
+    })
+
+
+DATA = {'name': 'John', 'age': 42, 'address': {'city': 'Paris', 'zip': '75000'}}
+
+
+class TestParse(object):
+    def test_parse(self):
+        parsed = mask.parse('{name,address{city}}')
+
+        assert list(parsed) == ['name', 'address']
+        assert parsed['name'] is True
+        assert list(parsed['address']) == ['city']
+        assert str(parsed) == '{name,address{city}}'
+
+    def test_optional_brackets(self):
+        assert mask.parse('name, address { city }') == mask.parse('{name,address{city}}')
+
+    def test_cached(self):
+        assert mask.parse('{name,age}') is mask.parse('{name,age}')
+
+    @pytest.mark.parametrize('value', ['{name', 'name}', '{,name}', '{{name}}', 'name{', 'na!me'])
+    def test_invalid(self, value):
+        with pytest.raises(mask.ParseError):
+            mask.parse(value)
+
+
+class TestMaskedMarshal(object):
+    def test_fields(self):
+        assert marshal(DATA, person(), mask='{name,address{city}}') == {'name': 'John', 'address': {'city': 'Paris'}}
+
+    def test_star(self):
+        assert marshal(DATA, person(), mask='{address{zip},*}') == {
+            'name': 'John', 'age': 42, 'address': {'zip': '75000'},
+        }
+
+    def test_inconsistent(self):
+        with pytest.raises(mask.MaskError):
+            marshal(DATA, person(), mask='{name{first}}')
+
+    def test_model_default_mask(self):
+        model = Model('Person', person(), mask='{name}')
+
+        assert marshal(DATA, model, mask=model.__mask__) == {'name': 'John'}
+
+
+class TestRequestMask(object):
+    def declare(self, api, ns):
+        model = ns.model('Person', person())
+        ns.add_model('Address', model['address'].model)
+
+        @ns.route('/people', public=True)
+        class People(Resource):
+            @ns.marshal_list_with(model)
+            def GET(self):
+                return [DATA]
+
+        api.add_namespace(ns)
+
+    def test_header(self, api, ns, client):
+        self.declare(api, ns)
+        response = client('/people', headers={mask.MASK_HEADER: '{name,address{city}}'})
+
+        assert json.loads(response.body.decode('utf-8')) == [{'name': 'John', 'address': {'city': 'Paris'}}]
+
+    def test_query_string(self, api, ns, client):
+        self.declare(api, ns)
+        response = client('/people?fields=age')
+
+        assert json.loads(response.body.decode('utf-8')) == [{'age': 42}]
+
+    def test_invalid(self, api, ns, client):
+        self.declare(api, ns)
+
+        assert client('/people', headers={mask.MASK_HEADER: '{name'}).status_int == 400
+        assert client('/people', headers={mask.MASK_HEADER: '{name{first}}'}).status_int == 400
+
+    def test_documented(self, api, ns):
+        self.declare(api, ns)
+        parameters = api.__schema__()['paths']['/people']['get']['parameters']
+
+        assert any(param['name'] == mask.MASK_HEADER and param['in'] == 'header' for param in parameters)
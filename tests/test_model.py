@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import copy
+
+import pytest
+
+from jsonschema import RefResolver
+from jsonschema.exceptions import ValidationError
+
+from wsgiservice_restplus import fields
+from wsgiservice_restplus.model import Model, VALIDATOR_CACHE_SIZE
+
+
+def person():
+    return Model('Person', {
+        'name': fields.String(mandatory=True),
+        'age': fields.Integer(),
+    })
+
+
+class TestResolved(object):
+    def test_cached(self):
+        model = person()
+
+        assert model.resolved is model.resolved
+        assert set(model.resolved) == {'name', 'age'}
+
+    def test_invalidated_by_mutation(self):
+        model = person()
+        resolved = model.resolved
+        model['email'] = fields.String
+
+        assert model.resolved is not resolved
+        assert 'email' in model.resolved
+
+    def test_invalidated_by_parent_mutation(self):
+        parent = person()
+        child = Model.inherit('Child', parent, {'school': fields.String})
+        resolved = child.resolved
+        parent['email'] = fields.String
+
+        assert child.resolved is not resolved
+        assert set(child.resolved) == {'name', 'age', 'email', 'school'}
+
+    def test_discriminator(self):
+        parent = Model('Pet', {'kind': fields.String(discriminator=True)})
+        cat = Model.inherit('Cat', parent, {'lives': fields.Integer})
+
+        assert cat.resolved['kind'].default == 'Cat'
+        assert parent.resolved['kind'].default == 'Pet'
+
+    def test_copy_drops_caches(self):
+        model = person()
+        model.resolved
+        model.__schema__
+
+        clone = copy.deepcopy(model)
+
+        assert clone._resolved is None
+        assert clone._schema_cache is None
+        assert set(clone.resolved) == set(model)
+
+
+class TestSchema(object):
+    def test_cached(self):
+        model = person()
+
+        assert model.__schema__ is model.__schema__
+        assert model.__schema__['required'] == ['name']
+
+    def test_invalidated_by_mutation(self):
+        model = person()
+        schema = model.__schema__
+        del model['age']
+
+        assert model.__schema__ is not schema
+        assert set(model.__schema__['properties']) == {'name'}
+
+    def test_invalidated_by_field_change(self):
+        model = person()
+        schema = model.__schema__
+        model['age'].description = 'In years'
+
+        assert model.__schema__ is not schema
+        assert model.__schema__['properties']['age']['description'] == 'In years'
+
+    def test_field_schema_cached(self):
+        field = fields.String(description='A name')
+
+        assert field.__schema__ is field.__schema__
+        field.description = 'Another name'
+        assert field.__schema__['description'] == 'Another name'
+
+    def test_dynamic(self):
+        values = ['first']
+        model = Model('Dynamic', {'name': fields.String(default=lambda: values[-1])})
+
+        assert model.__schema__['properties']['name']['default'] == 'first'
+        values.append('second')
+        assert model.__schema__['properties']['name']['default'] == 'second'
+
+
+class TestValidator(object):
+    def test_cached(self):
+        model = person()
+
+        assert model.validator() is model.validator()
+
+    def test_invalidated_by_mutation(self):
+        model = person()
+        validator = model.validator()
+        model['email'] = fields.String
+
+        assert model.validator() is not validator
+
+    def test_by_resolver(self):
+        model = person()
+        resolver = RefResolver.from_schema({})
+
+        assert model.validator(resolver=resolver) is model.validator(resolver=resolver)
+        assert model.validator(resolver=resolver) is not model.validator()
+
+    def test_bounded(self):
+        model = person()
+        for _ in range(VALIDATOR_CACHE_SIZE * 4):
+            model.validator(resolver=RefResolver.from_schema({}))
+
+        assert len(model._validators.cache) == VALIDATOR_CACHE_SIZE
+
+    def test_validate(self):
+        model = person()
+        model.validate({'name': 'John', 'age': 42})
+
+        with pytest.raises(ValidationError):
+            model.validate({'age': 42})
+
+
+class TestValidateMany(object):
+    def model(self):
+        return Model('Person', {
+            'name': fields.String(mandatory=True, min_length=3, pattern='^[A-Z]'),
+            'age': fields.Integer(min=0),
+        })
+
+    def test_valid(self):
+        assert self.model().validate_many([{'name': 'John'}, {'name': 'Jane', 'age': 3}]) == {}
+
+    def test_errors_by_index(self):
+        errors = self.model().validate_many([{'name': 'John'}, {'age': 3}, {'name': 'Ann', 'age': -1}])
+
+        assert list(errors) == [1, 2]
+        assert set(errors[1]) == {'name'}
+        assert set(errors[2]) == {'age'}
+
+    def test_one_error_per_key(self):
+        errors = self.model().validate_many([{'name': 'jo'}])
+
+        assert list(errors[0]) == ['name']
+        assert errors[0]['name'] in ("'jo' is too short", "'jo' does not match '^[A-Z]'")
+
+    def test_max_errors(self):
+        items = [{'name': 'jo', 'age': -1}, {'age': 3}, {}]
+        errors = self.model().validate_many(items, max_errors=2)
+
+        assert errors == {0: errors[0]}
+        assert set(errors[0]) == {'name', 'age'}
+
+    def test_max_errors_counts_keys(self):
+        items = [{'name': 'jo'}, {}]
+        errors = self.model().validate_many(items, max_errors=2)
+
+        assert list(errors) == [0, 1]
+
+    @pytest.mark.parametrize('max_errors', [0, -1])
+    def test_no_errors_allowed(self, max_errors):
+        model = self.model()
+        invalid = iter([{}])
+
+        with pytest.raises(ValueError):
+            model.validate_many(invalid, max_errors=max_errors)
+        assert list(invalid) == [{}]
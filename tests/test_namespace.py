@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import json
+
+import pytest
+
+from wsgiservice import Resource
+
+from wsgiservice_restplus.errors import SpecsError
+from wsgiservice_restplus.validation import PARAMETERS_ERROR_MESSAGE
+
+
+def body(response):
+    return json.loads(response.body.decode('utf-8'))
+
+
+@pytest.fixture
+def declare(api, ns):
+    def declare(collection_format, **kwargs):
+        @ns.route('/items', public=True)
+        class Items(Resource):
+            @ns.query_param('ids', convert=int, collection_format=collection_format, max_items=3, **kwargs)
+            def GET(self, ids):
+                return {'ids': ids}
+
+        api.add_namespace(ns)
+    return declare
+
+
+class TestCollectionParams(object):
+    @pytest.mark.parametrize('collection_format,query', [
+        ('csv', 'ids=1,2,3'),
+        ('ssv', 'ids=1%202%203'),
+        ('tsv', 'ids=1%092%093'),
+        ('pipes', 'ids=1|2|3'),
+        ('multi', 'ids=1&ids=2&ids=3'),
+    ])
+    def test_parsed(self, declare, client, collection_format, query):
+        declare(collection_format)
+        response = client('/items?' + query)
+
+        assert response.status_int == 200
+        assert body(response) == {'ids': [1, 2, 3]}
+
+    @pytest.mark.parametrize('collection_format,query', [
+        ('csv', 'ids=1,2,3,4'),
+        ('pipes', 'ids=1|2|3|4'),
+        ('multi', 'ids=1&ids=2&ids=3&ids=4'),
+    ])
+    def test_too_many_items(self, declare, client, collection_format, query):
+        declare(collection_format)
+        response = client('/items?' + query)
+
+        assert response.status_int == 400
+        assert body(response) == {
+            'message': PARAMETERS_ERROR_MESSAGE,
+            'errors': {'ids': 'Invalid ids: 4 items given, ids accepts at most 3 items'},
+        }
+
+    @pytest.mark.parametrize('collection_format,query', [
+        ('csv', 'ids=1,x'),
+        ('ssv', 'ids=1%20x'),
+        ('multi', 'ids=1&ids=x'),
+    ])
+    def test_invalid_item(self, declare, client, collection_format, query):
+        declare(collection_format)
+        response = client('/items?' + query)
+
+        assert response.status_int == 400
+        assert body(response)['message'] == PARAMETERS_ERROR_MESSAGE
+        assert body(response)['errors']['ids'].startswith('Invalid ids item 1: ')
+
+    def test_pattern(self, declare, client):
+        declare('csv', re=r'[0-5]')
+
+        assert client('/items?ids=1,5').status_int == 200
+        response = client('/items?ids=1,7')
+        assert response.status_int == 400
+        assert body(response)['errors'] == {'ids': 'Invalid ids item 1: \'7\' does not match pattern "[0-5]"'}
+
+    def test_documented(self, declare, api):
+        declare('pipes')
+        parameter = api.__schema__()['paths']['/items']['get']['parameters'][0]
+
+        assert parameter['name'] == 'ids'
+        assert parameter['collectionFormat'] == 'pipes'
+        assert parameter['maxItems'] == 3
+        assert parameter['type'] == 'array'
+
+    def test_unknown_format(self, ns):
+        with pytest.raises(SpecsError):
+            ns.query_param('ids', collection_format='commas')
+
+
+class TestListTypeParams(object):
+    @pytest.fixture
+    def declare(self, api, ns):
+        def declare(**kwargs):
+            @ns.route('/items', public=True)
+            class Items(Resource):
+                @ns.query_param('ids', type=[int], **kwargs)
+                def GET(self, ids):
+                    return {'ids': ids}
+
+            api.add_namespace(ns)
+        return declare
+
+    @pytest.mark.parametrize('kwargs', [{'collection_format': 'csv'}, {}])
+    def test_converted(self, declare, client, kwargs):
+        declare(**kwargs)
+        response = client('/items?ids=1,2,3')
+
+        assert response.status_int == 200
+        assert body(response) == {'ids': [1, 2, 3]}
+
+    def test_invalid_item(self, declare, client):
+        declare(collection_format='csv')
+        response = client('/items?ids=1,x')
+
+        assert response.status_int == 400
+        assert body(response)['errors']['ids'].startswith('Invalid ids item 1: ')
+
+    def test_documented(self, declare, client):
+        declare(collection_format='csv')
+        response = client('/swagger.json')
+
+        assert response.status_int == 200
+        parameter = body(response)['paths']['/items']['get']['parameters'][0]
+        assert parameter['type'] == 'array'
+        assert parameter['items'] == {'type': 'integer'}
+        assert parameter['collectionFormat'] == 'csv'
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import pytest
+
+from wsgiservice_restplus import fields
+from wsgiservice_restplus.errors import SpecsError
+from wsgiservice_restplus.patterns import is_catastrophic, register
+
+
+class TestRegister(object):
+    def test_compiled(self):
+        assert register(r'[a-z]+').match('abc')
+
+    def test_shared(self):
+        assert register(r'[0-9]{3}') is register(r'[0-9]{3}')
+
+    def test_invalid(self):
+        with pytest.raises(SpecsError):
+            register(r'[a-z')
+
+    def test_catastrophic(self):
+        with pytest.raises(SpecsError):
+            register(r'(a+)+$')
+
+
+class TestIsCatastrophic(object):
+    @pytest.mark.parametrize('pattern', [r'(a+)+', r'(a*)*b', r'(\w+\s?)*', r'((ab)*)+', r'(?:x+y?)+'])
+    def test_nested_repeats(self, pattern):
+        assert is_catastrophic(pattern)
+
+    @pytest.mark.parametrize('pattern', [r'[a-z]+', r'(ab)+', r'(a+b)+', r'(a{1,3})+', r'^\d{4}-\d{2}$', r'(\w+,)*\w+'])
+    def test_linear(self, pattern):
+        assert not is_catastrophic(pattern)
+
+
+class TestDeclaration(object):
+    def test_field_pattern(self):
+        with pytest.raises(SpecsError):
+            fields.String(pattern=r'(a+)+')
+
+    def test_field_re(self):
+        with pytest.raises(SpecsError):
+            fields.String(re=r'(\d*)*')
+
+    def test_param_re(self, ns):
+        with pytest.raises(SpecsError):
+            ns.query_param('name', re=r'(\d+)+')
+
+    def test_valid_field(self):
+        assert fields.String(pattern=r'[-0-9a-zA-Z]{36}').__schema__['pattern'] == r'[-0-9a-zA-Z]{36}'
@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import gzip
+import json
+import zlib
+
+from io import BytesIO
+
+from wsgiservice import Resource
+
+from wsgiservice_restplus import fields
+from wsgiservice_restplus.api import accepted_encoding, etag_matches
+from wsgiservice_restplus.namespace import Namespace
+
+
+def declare_items(ns):
+    item = ns.model('Item', {'id': fields.Integer, 'name': fields.String})
+
+    @ns.route('/items', public=True)
+    class Items(Resource):
+        @ns.marshal_list_with(item)
+        def GET(self):
+            return []
+
+    return item
+
+
+class TestSwaggerEncoding(object):
+    def test_etag_and_length(self, api, ns, client):
+        declare_items(ns)
+        api.add_namespace(ns)
+        response = client('/swagger.json')
+
+        assert response.status_int == 200
+        assert response.content_type == 'application/json'
+        assert response.headers['Vary'] == 'Accept-Encoding'
+        assert response.content_length == len(response.body)
+        assert response.etag
+        assert json.loads(response.body.decode('utf-8'))['paths'].keys() == {'/items'}
+
+    def test_gzip(self, api, ns, client):
+        declare_items(ns)
+        api.add_namespace(ns)
+        identity = client('/swagger.json')
+        response = client('/swagger.json', headers={'Accept-Encoding': 'gzip'})
+
+        assert response.content_encoding == 'gzip'
+        assert gzip.GzipFile(fileobj=BytesIO(response.body)).read() == identity.body
+        assert response.etag != identity.etag
+
+    def test_deflate(self, api, ns, client):
+        declare_items(ns)
+        api.add_namespace(ns)
+        identity = client('/swagger.json')
+        response = client('/swagger.json', headers={'Accept-Encoding': 'deflate, gzip;q=0.5'})
+
+        assert response.content_encoding == 'deflate'
+        assert zlib.decompress(response.body) == identity.body
+
+    def test_not_modified(self, api, ns, client):
+        declare_items(ns)
+        api.add_namespace(ns)
+        etag = client('/swagger.json').headers['ETag']
+
+        for header in (etag, 'W/' + etag, '"other", ' + etag, '*'):
+            response = client('/swagger.json', headers={'If-None-Match': header})
+            assert response.status_int == 304
+            assert response.body == b''
+            assert response.headers['ETag'] == etag
+
+        assert client('/swagger.json', headers={'If-None-Match': '"other"'}).status_int == 200
+
+    def test_encoded_once(self, api, ns):
+        declare_items(ns)
+        api.add_namespace(ns)
+
+        assert api.__encoded_schema__() is api.__encoded_schema__()
+
+
+class TestAcceptedEncoding(object):
+    def test_identity(self):
+        assert accepted_encoding(None) is None
+        assert accepted_encoding('identity') is None
+        assert accepted_encoding('gzip;q=0') is None
+
+    def test_preferences(self):
+        assert accepted_encoding('gzip, deflate') == 'gzip'
+        assert accepted_encoding('gzip;q=0.5, deflate') == 'deflate'
+        assert accepted_encoding('*') == 'gzip'
+        assert accepted_encoding('*, gzip;q=0') == 'deflate'
+
+
+class TestEtagMatches(object):
+    def test_matches(self):
+        assert etag_matches('"abc"', 'abc')
+        assert etag_matches('W/"abc"', 'abc')
+        assert etag_matches('"x", "abc"', 'abc')
+        assert etag_matches('*', 'abc')
+
+    def test_no_match(self):
+        assert not etag_matches(None, 'abc')
+        assert not etag_matches('"abcd"', 'abc')
+
+
+class TestIncrementalSchema(object):
+    def test_fragments_reused(self, api, ns):
+        declare_items(ns)
+        api.add_namespace(ns)
+        api.__schema__()
+        fragment = api._fragments[(ns, False)]
+
+        other = Namespace('other', path='/other', public=True)
+
+        @other.route('/', public=True)
+        class Other(Resource):
+            def GET(self):
+                return {}
+
+        api.add_namespace(other)
+        schema = api.__schema__()
+
+        assert api._fragments[(ns, False)] is fragment
+        assert set(schema['paths']) == {'/items', '/other'}
+
+    def test_fragment_stable(self, api, ns):
+        declare_items(ns)
+        api.add_namespace(ns)
+        schema = api.__schema__()
+
+        assert api.__schema__() is schema
+        assert api.__encoded_schema__() is api.__encoded_schema__()
+
+    def test_model_changed_in_place(self, api, ns, client):
+        item = declare_items(ns)
+        api.add_namespace(ns)
+        etag = client('/swagger.json').headers['ETag']
+
+        item['price'] = fields.Float
+        response = client('/swagger.json')
+
+        assert response.headers['ETag'] != etag
+        definition = json.loads(response.body.decode('utf-8'))['definitions']['Item']
+        assert 'price' in definition['properties']
+        assert client('/swagger.json', headers={'If-None-Match': etag}).status_int == 200
+
+    def test_nested_model_changed_in_place(self, api, ns):
+        item = declare_items(ns)
+        order = ns.model('Order', {'item': fields.Nested(item)})
+
+        @ns.route('/orders', public=True)
+        class Orders(Resource):
+            @ns.marshal_with(order)
+            def GET(self):
+                return {}
+
+        api.add_namespace(ns)
+        api.__schema__()
+        item['price'] = fields.Float
+
+        assert 'price' in api.__schema__()['definitions']['Item']['properties']
+
+    def test_apidoc_changed_in_place(self, api, ns):
+        declare_items(ns)
+        api.add_namespace(ns)
+        resource = ns.resources[0][0]
+        api.__schema__()
+
+        ns.doc(description='All the items')(resource.GET)
+
+        assert api.__schema__()['paths']['/items']['get']['description'] == 'All the items'
+
+    def test_unchanged_not_walked(self, api, ns, monkeypatch):
+        declare_items(ns)
+        api.add_namespace(ns)
+        api.__encoded_schema__()
+        api.__schema__()
+        walked = []
+        monkeypatch.setattr('wsgiservice_restplus.api.namespace_stamp', lambda *args: walked.append(args))
+
+        api.__encoded_schema__()
+        api.__schema__()
+
+        assert walked == []
+
+
+class TestPartialSchema(object):
+    def declare(self, api, ns):
+        declare_items(ns)
+        other = Namespace('other', path='/other', public=True)
+
+        @other.route('/', public=True)
+        class Other(Resource):
+            def GET(self):
+                return {}
+
+        api.add_namespace(ns)
+        api.add_namespace(other)
+
+    def test_by_namespace(self, api, ns, client):
+        self.declare(api, ns)
+        response = client('/swagger.json?namespace=other')
+
+        assert response.status_int == 200
+        specs = json.loads(response.body.decode('utf-8'))
+        assert list(specs['paths']) == ['/other']
+        assert 'definitions' not in specs
+
+    def test_by_namespaces(self, api, ns):
+        self.declare(api, ns)
+        specs = api.__schema__(namespaces='other,items')
+
+        assert set(specs['paths']) == {'/items', '/other'}
+        assert set(specs['definitions']) == {'Item'}
+
+    def test_by_tag(self, api, ns):
+        self.declare(api, ns)
+        specs = api.__schema__(tags=['items'])
+
+        assert list(specs['paths']) == ['/items']
+
+    def test_unknown(self, api, ns, client):
+        self.declare(api, ns)
+
+        assert client('/swagger.json?namespace=unknown').status_int == 404
+        assert client('/swagger.json?tag=unknown').status_int == 404
+
+    def test_cached(self, api, ns):
+        self.declare(api, ns)
+
+        assert api.__schema__(namespaces='items') is api.__schema__(namespaces=['items'])
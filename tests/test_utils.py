@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from wsgiservice_restplus import utils
+
+
+class TestMerge(object):
+    def test_merge(self):
+        first = {'a': 1, 'b': {'c': 2, 'd': 3}}
+        second = {'b': {'d': 4, 'e': 5}, 'f': 6}
+
+        assert utils.merge(first, second) == {'a': 1, 'b': {'c': 2, 'd': 4, 'e': 5}, 'f': 6}
+
+    def test_inputs_unchanged(self):
+        first = {'a': {'b': 1}}
+        second = {'a': {'c': 2}}
+        utils.merge(first, second)
+
+        assert first == {'a': {'b': 1}}
+        assert second == {'a': {'c': 2}}
+
+    def test_shares_unchanged_subtrees(self):
+        kept = {'x': [1, 2]}
+        added = {'y': {'z': 1}}
+        first = {'kept': kept, 'merged': {'a': 1}}
+        second = {'merged': {'b': 2}, 'added': added}
+        result = utils.merge(first, second)
+
+        assert result['kept'] is kept
+        assert result['added'] is added
+        assert result['merged'] is not first['merged']
+
+    def test_non_dict_second(self):
+        assert utils.merge({'a': 1}, None) is None
+        assert utils.merge({'a': {'b': 1}}, {'a': 2}) == {'a': 2}
+
+
+class TestLRUCache(object):
+    def test_get(self):
+        cache = utils.LRUCache(2)
+        cache['a'] = 1
+
+        assert cache.get('a') == 1
+        assert cache.get('b') is None
+        assert cache.get('b', 2) == 2
+        assert 'a' in cache
+
+    def test_bounded(self):
+        cache = utils.LRUCache(2)
+        cache['a'] = 1
+        cache['b'] = 2
+        cache.get('a')
+        cache['c'] = 3
+
+        assert len(cache) == 2
+        assert 'a' in cache
+        assert 'b' not in cache
+
+    def test_clear(self):
+        cache = utils.LRUCache(2)
+        cache['a'] = 1
+        cache.clear()
+
+        assert len(cache) == 0
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import json
+
+import pytest
+
+from jsonschema import Draft4Validator
+from wsgiservice import Resource
+
+from wsgiservice_restplus import Api, fields
+from wsgiservice_restplus.model import Model
+from wsgiservice_restplus.validation import (
+    PAYLOAD_ERROR_MESSAGE, PAYLOAD_VALIDATOR_ENGINE, CompiledValidator, compile_validator,
+)
+
+
+def item():
+    return Model('Item', {'id': fields.Integer(mandatory=True)})
+
+
+def order(item):
+    return Model('Order', {
+        'item': fields.Nested(item),
+        'items': fields.List(fields.Nested(item)),
+        'n': fields.Integer(min=1),
+        'express': fields.Boolean(),
+    })
+
+
+def post(client, path, data):
+    return client(path, method='POST', body=json.dumps(data).encode('utf-8'),
+                  headers={'Content-Type': 'application/json'})
+
+
+@pytest.fixture
+def declare(api, ns):
+    def declare(*models):
+        @ns.route('/orders')
+        class Orders(Resource):
+            @ns.payload_model(*models)
+            def POST(self):
+                return {'ok': True}
+
+        for model in models:
+            if isinstance(model, Model):
+                ns.add_model(model.name, model)
+        api.add_namespace(ns)
+    return declare
+
+
+class TestCompileValidator(object):
+    def test_nested_keys(self):
+        errors = compile_validator(order(item()))({'item': {'id': 'x'}, 'items': [{}], 'n': 0})
+
+        assert errors == {
+            'item.id': "'x' is not of type 'integer'",
+            'items.0.id': "'id' is a required property",
+            'n': '0 is less than the minimum of 1',
+        }
+
+    def test_valid(self):
+        assert compile_validator(order(item()))({'item': {'id': 1}, 'items': [{'id': 2}], 'n': 1}) == {}
+
+    def test_cached(self):
+        model = order(item())
+
+        assert compile_validator(model) is compile_validator(model)
+
+    def test_nested_model_changed(self):
+        nested = item()
+        model = order(nested)
+        validator = compile_validator(model)
+        nested['id'] = fields.String(mandatory=True)
+
+        assert compile_validator(model) is not validator
+        assert compile_validator(model)({'item': {'id': 'x'}}) == {}
+
+    def test_ancestors(self):
+        model = Model.inherit('Child', item(), {'name': fields.String(mandatory=True)})
+
+        assert compile_validator(model)({'id': 'x'}) == {
+            'id': "'x' is not of type 'integer'",
+            'name': "'name' is a required property",
+        }
+
+    def test_form_values(self):
+        validator = compile_validator(order(item()))
+
+        assert validator({'n': '2', 'express': 'true'}, convert=True) == {}
+        assert validator({'n': 'x'}, convert=True) == {'n': "'x' is not of type 'integer'"}
+        assert validator({'n': '2'}) == {'n': "'2' is not of type 'integer'"}
+
+
+class TestPayloadModel(object):
+    def test_invalid(self, declare, client):
+        declare(order(item()))
+        response = post(client, '/orders', {'item': {'id': 'x'}, 'n': 0})
+
+        assert response.status_int == 400
+        assert json.loads(response.body.decode('utf-8')) == {
+            'message': PAYLOAD_ERROR_MESSAGE,
+            'errors': {'item.id': "'x' is not of type 'integer'", 'n': '0 is less than the minimum of 1'},
+        }
+
+    def test_valid(self, declare, client):
+        declare(order(item()))
+        response = post(client, '/orders', {'item': {'id': 1}, 'n': 2})
+
+        assert response.status_int == 200
+        assert json.loads(response.body.decode('utf-8')) == {'ok': True}
+
+    def test_fields_dict(self, declare, client):
+        declare({'id': fields.Integer(mandatory=True)})
+        response = post(client, '/orders', {})
+
+        assert response.status_int == 400
+        assert json.loads(response.body.decode('utf-8'))['errors'] == {'id': "'id' is a required property"}
+
+    def test_form_values(self, declare, client):
+        declare(order(item()))
+
+        assert client('/orders', POST={'n': '2'}).status_int == 200
+        response = client('/orders', POST={'n': 'x'})
+        assert response.status_int == 400
+        assert json.loads(response.body.decode('utf-8'))['errors'] == {'n': "'x' is not of type 'integer'"}
+
+
+class TestValidatorEngine(object):
+    @pytest.fixture(params=[None, 'jsonschema', 'compiled'])
+    def api(self, request):
+        return Api(version='1.0', title='Test API', validator_engine=request.param)
+
+    def test_engine(self, api, declare, client):
+        model = order(item())
+        declare(model)
+        post(client, '/orders', {'item': {'id': 1}})
+        validator = model._payload_validator.validator
+
+        expected = Draft4Validator if api.validator_engine == 'jsonschema' else CompiledValidator
+        assert isinstance(validator, expected)
+
+    def test_model_engine(self, api, declare):
+        model = item()
+        declare(model)
+
+        expected = CompiledValidator if api.validator_engine == 'compiled' else Draft4Validator
+        assert isinstance(model.validator(), expected)
+
+    def test_unregistered_model(self, api, ns, client):
+        model = item()
+
+        @ns.route('/items')
+        class Items(Resource):
+            @ns.payload_model(model)
+            def POST(self):
+                return {'ok': True}
+
+        api.add_namespace(ns)
+        assert post(client, '/items', {'id': 'x'}).status_int == 400
+        assert model._payload_validator.engine == (api.validator_engine or PAYLOAD_VALIDATOR_ENGINE)
+        # The engine of the model itself is left alone
+        assert model.validator_engine == 'jsonschema'
+
+    def test_same_errors(self, declare, client):
+        declare(order(item()))
+        response = post(client, '/orders', {'item': {'id': 'x'}, 'items': [{}], 'n': 0})
+
+        assert json.loads(response.body.decode('utf-8'))['errors'] == {
+            'item.id': "'x' is not of type 'integer'",
+            'items.0.id': "'id' is a required property",
+            'n': '0 is less than the minimum of 1',
+        }
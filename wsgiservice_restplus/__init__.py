@@ -1,8 +1,9 @@
 # -*- coding: utf-8 -*-
 from __future__ import absolute_import
 
-from wsgiservice_restplus import fields, inputs
+from wsgiservice_restplus import fields, inputs, mask
 from wsgiservice_restplus.api import Api
+from wsgiservice_restplus.marshalling import marshal
 from wsgiservice_restplus.model import Model
 from wsgiservice_restplus.errors import RestError, SpecsError, ValidationError, SecurityError
 from wsgiservice_restplus.swagger import Swagger
@@ -14,6 +15,8 @@ __all__ = (
     'Model',
     'fields',
     'inputs',
+    'marshal',
+    'mask',
     'namespace',
     'RestError',
     'SpecsError',
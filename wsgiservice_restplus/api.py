@@ -1,17 +1,24 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
 
+import gzip
+import hashlib
+import json
+import zlib
 from collections import OrderedDict
+from io import BytesIO
 import six
 
 from jsonschema import RefResolver, FormatChecker
 
 import wsgiservice
+from wsgiservice import raise_304, raise_404
 from wsgiservice.resource import Resource as WSGIResource
 from wsgiservice_restplus.errors import SecurityError
+from wsgiservice_restplus.model import Model, VALIDATOR_ENGINES
 from wsgiservice_restplus.namespace import Namespace
-from wsgiservice_restplus.swagger import Swagger
-from wsgiservice_restplus.utils import default_id, camel_to_dash # deleted unpack
+from wsgiservice_restplus.swagger import Swagger, filter_operations, namespace_stamp, partial_specs
+from wsgiservice_restplus.utils import default_id, camel_to_dash, documentation_generation, LRUCache # deleted unpack
 from wsgiservice_restplus.wsgiservice_adaptors import get_resource_http_methods
 
 
@@ -21,6 +28,11 @@ HEADERS_BLACKLIST = ('Content-Length',)
 # Replaced output_json by None (cf. wsgiservice.Resource content negotiation)
 DEFAULT_REPRESENTATIONS = [('application/json', None)]
 
+# Content codings served for swagger.json, by order of preference
+SWAGGER_ENCODINGS = ('gzip', 'deflate')
+
+# Maximum number of (filtered) Swagger specification variants kept in cache
+SCHEMA_CACHE_SIZE = 256
 
 
 
@@ -57,6 +69,10 @@ class Api(object):
     :param FormatChecker format_checker: A jsonschema.FormatChecker object that is hooked into
     the Model validator. A default or a custom FormatChecker can be provided (e.g., with custom
     checkers), otherwise the default action is to not enforce any format validation.
+    :param str validator_engine: The engine validating the API models and payloads: ``jsonschema``
+    or ``compiled`` to validate with validators generated as Python source, falling back to jsonschema
+    for the schemas they don't support (see :func:`~wsgiservice_restplus.validation.compile_schema`).
+    By default, the models are validated by ``jsonschema`` and the payloads by ``compiled`` validators.
     """
 
     def __init__(self,
@@ -68,8 +84,12 @@ class Api(object):
             tags=None, prefix='',
             decorators=None,
             format_checker=None,
+            validator_engine=None,
             **kwargs):
 
+        if validator_engine is not None and validator_engine not in VALIDATOR_ENGINES:
+            raise ValueError('Unknown validator engine: {0}'.format(validator_engine))
+
         self.version = version
         self.title = title or 'API'
         self.description = description
@@ -88,9 +108,14 @@ class Api(object):
         self.tags = tags or []
         self._schema = None # cache for Swagger JSON specification
         self._internal_schema = None
+        self._partial_schemas = LRUCache(SCHEMA_CACHE_SIZE)  # cache for namespace/tag filtered specifications
+        self._encoded_schemas = LRUCache(SCHEMA_CACHE_SIZE)  # cache for the pre-encoded Swagger JSON specification
+        self._fragments = {}  # cache for per-namespace Swagger specification fragments
+        self._generation = None  # documentation generation the fragments were last checked at
         self.models = {}
         self._refresolver = None
         self.format_checker = format_checker
+        self.validator_engine = validator_engine
         self.namespaces = []
         self.representations = OrderedDict(DEFAULT_REPRESENTATIONS)
         self.prefix = prefix
@@ -101,12 +126,15 @@ class Api(object):
 
         kwargs['endpoint'] = default_endpoint(resource, namespace)
         self.resources.append((resource, url, kwargs))
+        self.invalidate_schema(namespace)
 
 
     def add_namespace(self, ns):
         """Adds a namespace to the api.namespaces list, adds the namespace models to its owm self.models list
         and registers the namespace resources; also adds itself to the the namespace.apis list.
 
+        A namespace with the same name as an already added one replaces it.
+
         :param ns: Namespace obj
         """
 
@@ -115,15 +143,40 @@ class Api(object):
             raise SecurityError('Namespace security use inconsistent with Api security definitions in authorizations')
 
         if ns not in self.namespaces:
-            self.namespaces.append(ns)
+            replaced = [n for n in self.namespaces if n.name == ns.name]
+            if replaced:
+                self._remove_namespace(replaced[0])
+                self.namespaces[self.namespaces.index(replaced[0])] = ns
+            else:
+                self.namespaces.append(ns)
             if self not in ns.apis:
                 ns.apis.append(self)
 
         for resource, url, kwargs in ns.resources:
             self.register_resource(ns, resource, url, **kwargs)
 
+        # Models are shared by name: redefining one may change fragments of other namespaces
+        if any(self.models.get(name, definition) is not definition for name, definition in ns.models.items()):
+            self.invalidate_schema()
+
         for name, definition in ns.models.items():
-            self.models[name] = definition
+            self.register_model(name, definition)
+
+    def register_model(self, name, definition):
+        """Registers a model (validated with the API validator engine)"""
+
+        if isinstance(definition, Model) and self.validator_engine is not None:
+            definition.validator_engine = self.validator_engine
+        self.models[name] = definition
+
+    def _remove_namespace(self, ns):
+        """Unregisters the resources of a namespace about to be replaced"""
+
+        removed = [resource for resource, _, _ in ns.resources]
+        self.resources = [entry for entry in self.resources if entry[0] not in removed]
+        if self in ns.apis:
+            ns.apis.remove(self)
+        self.invalidate_schema(ns)
 
 
     def _security_requirements_in_authorizations(self, ns):
@@ -182,23 +235,116 @@ class Api(object):
         """
         return self.prefix
 
-    def __schema__(self, show_internal=False):
+    def __schema__(self, show_internal=False, namespaces=None, tags=None):
         """The Swagger specifications/schema for this API
 
+        :param bool show_internal: include non-public namespaces and resources
+        :param namespaces: only include the paths of these namespaces (by name)
+        :param tags: only include the operations having one of these tags
         :returns dict: the schema as a serializable dict
+        :raises ValueError: if an unknown namespace or tag is requested
         """
 
+        self._drop_stale_fragments()
+        return self._get_schema(show_internal, namespaces, tags)
+
+    def _get_schema(self, show_internal=False, namespaces=None, tags=None):
+        """Builds (or gets from cache) the Swagger specification, whose fragments are up to date"""
+
+        if namespaces or tags:
+            return self._partial_schema(show_internal, _names(namespaces), _names(tags))
+
         if show_internal and self._internal_schema:
             return self._internal_schema
         elif show_internal:
-            self._internal_schema = Swagger(self).as_dict(show_internal=show_internal)
+            self._internal_schema = Swagger(self).as_dict(show_internal=show_internal, fragments=self._fragments)
             return self._internal_schema
 
         if not self._schema:
-            self._schema = Swagger(self).as_dict()
+            self._schema = Swagger(self).as_dict(fragments=self._fragments)
 
         return self._schema
 
+    def invalidate_schema(self, ns=None):
+        """Drops the cached Swagger specifications so they are rebuilt on next access.
+        Only the fragment of the given namespace is rebuilt, the other ones are reused.
+
+        :param Namespace ns: the namespace whose fragment is stale (all fragments if None)
+        """
+
+        if ns is None:
+            self._fragments.clear()
+        else:
+            for key in [key for key in self._fragments if key[0] is ns]:
+                del self._fragments[key]
+        self._schema = None
+        self._internal_schema = None
+        self._partial_schemas.clear()
+        self._encoded_schemas.clear()
+        self._refresolver = None
+
+    def _drop_stale_fragments(self):
+        """Invalidates the cached specifications built from a namespace whose resources documentation
+        or models changed in place since (eg. ``model[name] = field``).
+
+        The fragments are only checked once a model or a namespace documentation changed (see
+        :func:`~wsgiservice_restplus.utils.touch_documentation`): fields or ``__apidoc__`` dicts
+        modified in place, outside of the models and the namespace decorators, require an explicit
+        :meth:`invalidate_schema`."""
+
+        generation = documentation_generation()
+        if generation == self._generation:
+            return
+        self._generation = generation
+        stale = set(ns for (ns, _), fragment in list(self._fragments.items())
+                    if namespace_stamp(ns, fragment['models']) != fragment['stamp'])
+        for ns in stale:
+            self.invalidate_schema(ns)
+
+    def _partial_schema(self, show_internal, namespaces, tags):
+        """Builds (or gets from cache) the specification restricted to some namespaces and/or tags"""
+
+        key = (show_internal, namespaces, tags)
+        schema = self._partial_schemas.get(key)
+        if schema is not None:
+            return schema
+
+        full_schema = self._get_schema(show_internal=show_internal)
+        if namespaces:
+            visible = dict((ns.name, ns) for ns in self.namespaces if ns.public or show_internal)
+            unknown = [name for name in namespaces if name not in visible]
+            if unknown:
+                raise ValueError('Unknown namespace(s): {0}'.format(', '.join(unknown)))
+            paths = {}
+            for name in namespaces:
+                paths.update(self._fragments[(visible[name], show_internal)]['paths'])
+        else:
+            paths = full_schema['paths']
+        if tags:
+            unknown = set(tags) - set(tag['name'] for tag in full_schema.get('tags', []))
+            if unknown:
+                raise ValueError('Unknown tag(s): {0}'.format(', '.join(sorted(unknown))))
+            paths = filter_operations(paths, tags)
+
+        schema = partial_specs(full_schema, paths)
+        self._partial_schemas[key] = schema
+        return schema
+
+    def __encoded_schema__(self, show_internal=False, namespaces=None, tags=None):
+        """The Swagger specifications encoded once as JSON bytes (plus compressed copies)
+
+        :returns EncodedSchema: the encoded schema for the requested variant
+        :raises ValueError: if an unknown namespace or tag is requested
+        """
+
+        self._drop_stale_fragments()
+        key = (show_internal, _names(namespaces), _names(tags))
+        encoded = self._encoded_schemas.get(key)
+        if encoded is None:
+            encoded = EncodedSchema(self._get_schema(show_internal=show_internal, namespaces=namespaces, tags=tags))
+            self._encoded_schemas[key] = encoded
+        return encoded
+
 
     @property
     def refresolver(self):
@@ -209,20 +355,130 @@ class Api(object):
         return self._refresolver
 
 
+def _names(value):
+    """Normalizes names given as an iterable or a comma separated string into a sorted tuple"""
+
+    if not value:
+        return ()
+    if isinstance(value, six.string_types):
+        value = value.split(',')
+    return tuple(sorted(set(name.strip() for name in value if name.strip())))
+
+
+class EncodedSchema(object):
+    """A Swagger specification serialized once to JSON bytes, along with its gzip and deflate
+    compressed copies and a strong content-hash ETag for each of them.
+
+    :param dict schema: the serializable Swagger specification
+    """
+
+    def __init__(self, schema):
+        self.body = json.dumps(schema).encode('utf-8')
+        self.etag = hashlib.sha1(self.body).hexdigest()
+        self.encoded = {
+            'gzip': _gzip(self.body),
+            'deflate': zlib.compress(self.body),
+        }
+
+    def get(self, encoding=None):
+        """Returns the ``(body, etag)`` pair for a given content coding (``None`` for identity)"""
+
+        if encoding is None:
+            return self.body, self.etag
+        # Strong validators must differ between content codings of the same representation
+        return self.encoded[encoding], '{0}-{1}'.format(self.etag, encoding)
+
+
+def _gzip(data):
+    """Gzip compresses bytes with a fixed mtime so that the output is deterministic"""
+
+    buf = BytesIO()
+    with gzip.GzipFile(fileobj=buf, mode='wb', mtime=0) as compressed:
+        compressed.write(data)
+    return buf.getvalue()
+
+
+def accepted_encoding(header):
+    """Returns the preferred content coding from :data:`SWAGGER_ENCODINGS` accepted by an
+    ``Accept-Encoding`` header value or ``None`` for the identity coding.
+
+    :param str header: the ``Accept-Encoding`` header value
+    """
+
+    accepted = {}
+    for item in (header or '').split(','):
+        parts = item.strip().split(';')
+        coding = parts[0].strip().lower()
+        quality = 1.0
+        for param in parts[1:]:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding:
+            accepted[coding] = quality
+
+    best, best_quality = None, 0.0
+    for coding in SWAGGER_ENCODINGS:
+        quality = accepted.get(coding, accepted.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def etag_matches(header, etag):
+    """Checks whether an ``If-None-Match`` header value matches a given (unquoted) ETag"""
+
+    for candidate in (header or '').split(','):
+        candidate = candidate.strip()
+        if candidate == '*':
+            return True
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate.strip('"') == etag:
+            return True
+    return False
+
+
 def generate_swagger_resource(api, swagger_path):
     """Returns a wsgiservice Swagger documentation Resource class that binds the Api instance"""
 
     class SwaggerResource(WSGIResource):
-        """Resource for the Swagger specification of the bound Api"""
+        """Resource for the Swagger specification of the bound Api
+
+        The specification is served from pre-encoded (and precompressed) bytes, with a strong
+        ETag and ``If-None-Match`` handling, so it is never re-encoded per request.
+        It can be restricted to some namespaces and/or tags (comma separated names) using the
+        ``namespace`` and ``tag`` query parameters.
+        """
 
         _path = swagger_path
 
-        def GET(self, internal=False):
+        def GET(self, internal=False, namespace=None, tag=None):
 
             show_internal = (six.text_type(internal) or "").lower() == "true"
 
+            try:
+                encoded = api.__encoded_schema__(show_internal=show_internal, namespaces=namespace, tags=tag)
+            except ValueError:
+                raise_404(self)
+            encoding = accepted_encoding(self.request.headers.get('Accept-Encoding'))
+            body, etag = encoded.get(encoding)
+
             self.type = str('application/json')
-            return api.__schema__(show_internal=show_internal)
+            self.response.headers[str('ETag')] = str('"{0}"'.format(etag))
+            self.response.headers[str('Vary')] = str('Accept-Encoding')
+
+            if etag_matches(self.request.headers.get('If-None-Match'), etag):
+                raise_304(self)
+
+            self.response.content_type = str('application/json')
+            if encoding:
+                self.response.content_encoding = str(encoding)
+            self.response.body = body
+            self.response.content_length = len(body)
 
     return SwaggerResource
 
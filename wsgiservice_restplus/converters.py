@@ -1,5 +1,17 @@
 from paste.deploy.converters import asbool
 from dateutil.parser import parse as parse_datetime
+from dateutil.tz import tzoffset, tzutc
+from six import string_types
+
+from wsgiservice_restplus.inputs import _parse_iso8601
+from wsgiservice_restplus.utils import LRUCache
+
+#: The number of converted datetimes kept in cache
+DATETIME_CACHE_SIZE = 1024
+
+_datetimes = LRUCache(DATETIME_CACHE_SIZE)
+
+UTC = tzutc()
 
 
 def Boolean(value):
@@ -15,6 +27,22 @@ def Integer(value):
     return int(value)
 
 def DateTime(value):
-    """Converts value to a valid datetime"""
-    return parse_datetime(value)
+    """Converts value to a valid datetime
+
+    Canonical ISO 8601 values are parsed strictly, the others by dateutil (with equal results).
+    The most recently converted ISO 8601 values are kept in a bounded cache: the others are not,
+    as dateutil completes partial values (eg. ``10:00``) with the current date.
+    """
+    if not isinstance(value, string_types):
+        return parse_datetime(value)
+    converted = _datetimes.get(value)
+    if converted is None:
+        converted = _parse_iso8601(value, UTC, _offset)
+        if converted is None:
+            return parse_datetime(value)
+        _datetimes[value] = converted
+    return converted
 
+def _offset(minutes):
+    """Get the dateutil timezone of an offset"""
+    return tzoffset(None, minutes * 60) if minutes else UTC
@@ -2,12 +2,18 @@
 from __future__ import unicode_literals
 
 from calendar import timegm
+from collections import MutableMapping
 from datetime import date
 from datetime import datetime
+from decimal import Context
 from decimal import Decimal
 from decimal import ROUND_HALF_EVEN
 from email.utils import formatdate
+from math import isinf
+from math import isnan
 
+from six import integer_types
+from six import iteritems
 from six import itervalues
 from six import string_types
 from six import text_type
@@ -20,9 +26,15 @@ from wsgiservice_restplus.errors import RestError
 from wsgiservice_restplus.inputs import date_from_iso8601
 from wsgiservice_restplus.inputs import datetime_from_iso8601
 from wsgiservice_restplus.inputs import datetime_from_rfc822
+from wsgiservice_restplus.patterns import register as register_pattern
 from wsgiservice_restplus.utils import format_definition_reference
 from wsgiservice_restplus.utils import not_none
 
+try:
+    import numpy
+except ImportError:  # NumPy is optional
+    numpy = None
+
 __all__ = ('Raw', 'String', 'FormattedString',
            'DateTime', 'Date',
            'Boolean', 'Integer', 'Float', 'Arbitrary', 'Fixed',
@@ -46,20 +58,64 @@ def is_indexable_but_not_string(obj):
 
 def get_value(key, obj, default=None):
     '''Helper for pulling a keyed value off various types of objects'''
-    if isinstance(key, int):
-        return _get_value_for_key(key, obj, default)
-    elif callable(key):
-        return key(obj)
-    else:
-        return _get_value_for_keys(key.split('.'), obj, default)
+    return compile_accessor(key)(obj, default)
 
 
-def _get_value_for_keys(keys, obj, default):
-    if len(keys) == 1:
-        return _get_value_for_key(keys[0], obj, default)
-    else:
-        return _get_value_for_keys(
-            keys[1:], _get_value_for_key(keys[0], obj, default), default)
+#: Compiled accessors by key
+_accessors = {}
+
+
+def compile_accessor(key):
+    '''
+    Compile (once per key) the accessor pulling a keyed value off various types of objects.
+
+    Dotted keys are split once into a chain of getters, each one specialised for dicts
+    and falling back on the generic item/attribute lookup for other objects.
+
+    :param key: An index, a (dotted) key or a callable taking the object
+    :return: an ``accessor(obj, default=None)`` function
+    '''
+    if callable(key):
+        return lambda obj, default=None: key(obj)
+    accessor = _accessors.get(key)
+    if accessor is None:
+        if isinstance(key, int):
+            accessor = _compile_key_getter(key)
+        else:
+            getters = [_compile_key_getter(part) for part in key.split('.')]
+            if len(getters) == 1:
+                accessor = getters[0]
+            else:
+                def accessor(obj, default=None):
+                    for getter in getters:
+                        obj = getter(obj, default)
+                    return obj
+        _accessors[key] = accessor
+    return accessor
+
+
+#: Whether instances of a type are indexable (see :func:`is_indexable_but_not_string`)
+_indexable_types = {}
+
+
+def _compile_key_getter(key):
+    def getter(obj, default=None):
+        cls = type(obj)
+        if cls is dict:
+            try:
+                return obj[key]
+            except KeyError:
+                return getattr(obj, key, default)
+        indexable = _indexable_types.get(cls)
+        if indexable is None:
+            indexable = _indexable_types[cls] = is_indexable_but_not_string(obj)
+        if indexable:
+            try:
+                return obj[key]
+            except (IndexError, TypeError, KeyError):
+                pass
+        return getattr(obj, key, default)
+    return getter
 
 
 def _get_value_for_key(key, obj, default):
@@ -88,10 +144,95 @@ def to_marshallable_type(obj):
     return dict(obj.__dict__)
 
 
+#: The column length from which numeric columns are converted with NumPy (when available)
+NUMPY_THRESHOLD = 64
+
+#: Field attributes holding cached values (they don't invalidate caches when set)
+CACHE_ATTRIBUTES = frozenset(('_version', '_schema_cache', '_dynamic', '_dispatch'))
+
+_slot_names = {}
+
+
+def slot_names(cls):
+    '''The names of the attributes declared in the ``__slots__`` of a class and of its bases'''
+    names = _slot_names.get(cls)
+    if names is None:
+        names = []
+        for klass in reversed(cls.__mro__):
+            slots = klass.__dict__.get('__slots__', ())
+            for name in (slots,) if isinstance(slots, string_types) else slots:
+                if name not in names and name not in ('__dict__', '__weakref__'):
+                    names.append(name)
+        names = _slot_names[cls] = tuple(names)
+    return names
+
+
+class ValidParams(MutableMapping):
+    '''
+    The wsgiservice validation parameters of a field (``re``, ``convert``, ``doc`` and ``mandatory``).
+
+    A compact mapping with a fixed set of keys.
+    '''
+    __slots__ = ('re', 'convert', 'doc', 'mandatory')
+
+    def __init__(self, re=None, convert=None, doc=None, mandatory=False):
+        self.re = re
+        self.convert = convert
+        self.doc = doc
+        self.mandatory = mandatory
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __delitem__(self, key):
+        raise TypeError('Validation parameters can\'t be deleted')
+
+    def __iter__(self):
+        return iter(self.__slots__)
+
+    def __len__(self):
+        return len(self.__slots__)
+
+    def __getstate__(self):
+        return dict(self)
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+def instance(cls):
+    if isinstance(cls, type):
+        return cls()
+    return cls
+
+
+def resolve_mapping(mapping, cls):
+    '''
+    Get the value mapped to a class or, failing that, to its nearest mapped base class
+    (following the method resolution order).
+
+    :return: The mapped value or ``None`` if neither the class nor its bases are mapped
+    '''
+    for klass in getattr(cls, '__mro__', (cls,)):
+        if klass in mapping:
+            return mapping[klass]
+    return None
+
+
 def make_mandatory(field_obj):
     """Makes the field object mandatory - WIP """
 
-    if hasattr(field_obj, 'valid_params'):
+    if not isinstance(field_obj, type) and hasattr(field_obj, 'valid_params'):
         field_obj.valid_params['mandatory'] = True
         return field_obj
     else:
@@ -116,6 +257,10 @@ class Raw(object):
     :param bool readonly: Is the field read only? (for documentation purpose)
     :param example: An optional data example (for documentation purpose)
     :param callable mask: An optional mask function to be applied to output
+
+    Fields are slotted (see :func:`slot_names`): subclasses declare their own
+    attributes in ``__slots__`` (mixins declare none, their attributes are declared
+    by the concrete classes using them), otherwise instances get a ``__dict__``.
     '''
     #: The JSON/Swagger schema type
     __schema_type__ = 'object'
@@ -124,6 +269,15 @@ class Raw(object):
     #: An optional JSON/Swagger schema example
     __schema_example__ = None
 
+    __slots__ = ('attribute', 'default', 'title', 'description', 'required', 'readonly', 'example', 'mask',
+                 'valid_params',
+                 # Incremented on each attribute change
+                 '_version',
+                 # Cached ``(stamp, schema)`` pair
+                 '_schema_cache',
+                 # Whether the last computed schema depends on callable attributes
+                 '_dynamic')
+
     def __init__(self, default=None, attribute=None, title=None, description=None,
                  mandatory=None, readonly=None, example=None, mask=None, **kwargs):
         self.attribute = attribute
@@ -134,13 +288,17 @@ class Raw(object):
         self.readonly = readonly
         self.example = example or self.__schema_example__
         self.mask = mask
-
-        self.valid_params = {
-            "re": kwargs.get('re', None),
-            "convert": kwargs.get('convert', None),
-            "doc": self.description or None,
-            "mandatory": self.required
-        }
+        self._schema_cache = None
+        self._dynamic = False
+
+        if kwargs.get('re') is not None:
+            register_pattern(kwargs['re'])
+        self.valid_params = ValidParams(
+            re=kwargs.get('re', None),
+            convert=kwargs.get('convert', None),
+            doc=self.description or None,
+            mandatory=self.required
+        )
 
         format_description = kwargs.get('add_format')
         if format_description and type(format_description) == str:
@@ -163,15 +321,99 @@ class Raw(object):
         '''
         return value
 
+    def format_many(self, values):
+        '''
+        Formats a column of values (none of them being ``None``) at once.
+        Formats each value with :meth:`format` by default: field classes
+        whose formatting can be done in bulk should override this.
+
+        :param list values: The values to format
+        :raises MarshallingError: In case of formatting problem
+        '''
+        return [self.format(value) for value in values]
+
+    def accessor(self, key=None):
+        '''
+        The compiled accessor pulling the field value off an object, for the field attribute
+        or for the given key when the attribute is not set (see :func:`compile_accessor`).
+        '''
+        return compile_accessor(key if self.attribute is None else self.attribute)
+
+    def output(self, key, obj):
+        '''
+        Pulls the value for the given key from the object, applies the
+        field's formatting and returns the result. If the key is not found
+        in the object, returns the default value.
+
+        This is the uncompiled, per value marshalling path
+        (see :mod:`~wsgiservice_restplus.marshalling` for the compiled one).
+
+        :param str key: The key (or index) to look for when the field attribute is not set
+        :param obj: The object to pull the value from
+        :raises MarshallingError: In case of formatting problem
+        '''
+        value = self.accessor(key)(obj)
+        if value is None:
+            default = self._v('default')
+            return self.format(default) if default else default
+        try:
+            data = self.format(value)
+        except MarshallingError:
+            raise
+        except Exception as e:
+            raise MarshallingError(e)
+        return self.mask(data) if callable(self.mask) else data
+
+    def __setattr__(self, name, value):
+        super(Raw, self).__setattr__(name, value)
+        if name not in CACHE_ATTRIBUTES:
+            # Subclasses may set their attributes before calling Raw.__init__
+            super(Raw, self).__setattr__('_version', getattr(self, '_version', 0) + 1)
+
+    def _attributes(self):
+        '''The field attributes, as a dict'''
+        attributes = dict((name, getattr(self, name)) for name in slot_names(type(self)) if hasattr(self, name))
+        attributes.update(getattr(self, '__dict__', {}))
+        return attributes
+
+    def __getstate__(self):
+        # The cached schema is not part of the field state: don't copy (or pickle) it along
+        state = self._attributes()
+        state.pop('_schema_cache', None)
+        return state
+
+    def __setstate__(self, state):
+        state.setdefault('_schema_cache', None)
+        for name, value in iteritems(state):
+            object.__setattr__(self, name, value)
+
+    def _stamp(self):
+        '''Identify the current state of the field (and of the fields it depends on)'''
+        return self._version
+
     def _v(self, key):
         '''Helper for getting a value from attribute allowing callable'''
         value = getattr(self, key)
-        return value() if callable(value) else value
+        if callable(value):
+            # The schema can't be cached as the value is evaluated on each call
+            self._dynamic = True
+            return value()
+        return value
 
-    # @cached_property
-    @property # TODO: check vs. cached_property
+    @property
     def __schema__(self):
-        return not_none(self.schema())
+        '''
+        The field JSON schema, cached until one of the field attributes changes.
+        It is computed on each access when it depends on callable attributes.
+        '''
+        stamp = self._stamp()
+        cached = getattr(self, '_schema_cache', None)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        self._dynamic = False
+        schema = not_none(self.schema())
+        self._schema_cache = None if self._dynamic else (stamp, schema)
+        return schema
 
     def schema(self):
         return {
@@ -199,6 +441,7 @@ class Nested(Raw):
         null)
     '''
     __schema_type__ = None
+    __slots__ = ('model', 'as_list', 'allow_null')
 
     def __init__(self, model, allow_null=False, as_list=False, **kwargs):
         self.model = model
@@ -210,6 +453,28 @@ class Nested(Raw):
     def nested(self):
         return getattr(self.model, 'resolved', self.model)
 
+    def _stamp(self):
+        return self._version, getattr(self.model, 'name', None)
+
+    def output(self, key, obj):
+        value = self.accessor(key)(obj)
+        if value is None:
+            if self.allow_null:
+                return None
+            elif self.default is not None:
+                return self.default
+        if self.as_list:
+            return [self.marshal(item) for item in value or []]
+        return self.marshal(value)
+
+    def marshal(self, value, model=None):
+        '''Marshal a value with the nested model (uncompiled path)'''
+        model = self.nested if model is None else getattr(model, 'resolved', model)
+        return dict(
+            (name, instance(field).output(name, value))
+            for name, field in iteritems(model)
+        )
+
     def schema(self):
         schema = super(Nested, self).schema()
         ref = format_definition_reference(self.nested.name)
@@ -223,7 +488,7 @@ class Nested(Raw):
         return schema
 
     def clone(self, mask=None):
-        kwargs = self.__dict__.copy()
+        kwargs = self._attributes()
         model = kwargs.pop('model')
         if mask:
             model = mask.apply(model.resolved if hasattr(model, 'resolved') else model)
@@ -239,6 +504,7 @@ class List(Raw):
 
     :param cls_or_instance: The field type the list will contain.
     '''
+    __slots__ = ('min_items', 'max_items', 'unique', 'container')
 
     def __init__(self, cls_or_instance, **kwargs):
         self.min_items = kwargs.pop('min_items', None)
@@ -262,6 +528,9 @@ class List(Raw):
 
         return self.model
 
+    def _stamp(self):
+        return self._version, self.container._stamp()
+
     def format(self, value):
         # Convert all instances in typed list to container type
         if isinstance(value, set):
@@ -285,10 +554,12 @@ class List(Raw):
                       uniqueItems=self._v('unique'))
         schema['type'] = 'array'
         schema['items'] = self.container.__schema__
+        if self.container._dynamic:
+            self._dynamic = True
         return schema
 
     def clone(self, mask=None):
-        kwargs = self.__dict__.copy()
+        kwargs = self._attributes()
         model = kwargs.pop('container')
         if mask:
             model = mask.apply(model)
@@ -297,11 +568,16 @@ class List(Raw):
 
 class StringMixin(object):
     __schema_type__ = 'string'
+    #: The attributes to declare in the ``__slots__`` of the classes using the mixin
+    __mixin_slots__ = ('min_length', 'max_length', 'pattern')
+    __slots__ = ()
 
     def __init__(self, *args, **kwargs):
         self.min_length = kwargs.pop('min_length', None)
         self.max_length = kwargs.pop('max_length', None)
         self.pattern = kwargs.pop('pattern', None)
+        if self.pattern is not None and not callable(self.pattern):
+            register_pattern(self.pattern)
         super(StringMixin, self).__init__(*args, **kwargs)
         if not self.valid_params.get('convert'):
             self.valid_params['convert'] = StringConverter
@@ -315,6 +591,10 @@ class StringMixin(object):
 
 
 class MinMaxMixin(object):
+    #: The attributes to declare in the ``__slots__`` of the classes using the mixin
+    __mixin_slots__ = ('minimum', 'excluisveMinimum', 'maximum', 'exclusiveMaximum')
+    __slots__ = ()
+
     def __init__(self, *args, **kwargs):
         self.minimum = kwargs.pop('min', None)
         self.excluisveMinimum = kwargs.pop('exclusiveMin', None)
@@ -333,6 +613,8 @@ class MinMaxMixin(object):
 
 class NumberMixin(MinMaxMixin):
     __schema_type__ = 'number'
+    __mixin_slots__ = MinMaxMixin.__mixin_slots__ + ('multiple',)
+    __slots__ = ()
 
     def __init__(self, *args, **kwargs):
         self.multiple = kwargs.pop('multiple', None)
@@ -350,6 +632,8 @@ class String(StringMixin, Raw):
     be converted to :class:`unicode` in python2 and :class:`str` in
     python3.
     '''
+    __slots__ = StringMixin.__mixin_slots__ + ('enum', 'discriminator')
+
     def __init__(self, *args, **kwargs):
         self.enum = kwargs.pop('enum', None)
         self.discriminator = kwargs.pop('discriminator', None)
@@ -364,6 +648,12 @@ class String(StringMixin, Raw):
         except ValueError as ve:
             raise MarshallingError(ve)
 
+    def format_many(self, values):
+        try:
+            return list(map(text_type, values))
+        except ValueError as ve:
+            raise MarshallingError(ve)
+
     def schema(self):
         enum = self._v('enum')
         schema = super(String, self).schema()
@@ -380,6 +670,7 @@ class Integer(NumberMixin, Raw):
     :param int default: The default value for the field, if no value is specified.
     '''
     __schema_type__ = 'integer'
+    __slots__ = NumberMixin.__mixin_slots__
 
     def __init__(self, *args, **kwargs):
         super(Integer, self).__init__(*args, **kwargs)
@@ -394,6 +685,12 @@ class Integer(NumberMixin, Raw):
         except ValueError as ve:
             raise MarshallingError(ve)
 
+    def format_many(self, values):
+        try:
+            return list(map(int, values))
+        except ValueError as ve:
+            raise MarshallingError(ve)
+
 
 class Float(NumberMixin, Raw):
     '''
@@ -401,6 +698,7 @@ class Float(NumberMixin, Raw):
 
     ex : 3.141592653589793 3.1415926535897933e-06 3.141592653589793e+24 nan inf -inf
     '''
+    __slots__ = NumberMixin.__mixin_slots__
 
     def __init__(self, *args, **kwargs):
         super(Float, self).__init__(*args, **kwargs)
@@ -413,16 +711,55 @@ class Float(NumberMixin, Raw):
         except ValueError as ve:
             raise MarshallingError(ve)
 
+    def format_many(self, values):
+        try:
+            if numpy is not None and len(values) >= NUMPY_THRESHOLD:
+                return numpy.asarray(values, dtype=numpy.float64).tolist()
+            return list(map(float, values))
+        except ValueError as ve:
+            raise MarshallingError(ve)
+
+
+#: The number of significant digits a float always holds exactly
+FLOAT_DIGITS = 15
+#: Integers up to this bound are exactly held by a float
+MAX_FLOAT_INTEGER = 2 ** 53
+
 
 class Arbitrary(NumberMixin, Raw):
     '''
     A floating point number with an arbitrary precision.
 
     ex: 634271127864378216478362784632784678324.23432
+
+    :param bool as_number: Output a JSON number instead of a string when it holds the value exactly
+        (integers up to 2**53, floats and decimals of at most 15 significant digits)
     '''
+    __slots__ = NumberMixin.__mixin_slots__ + ('as_number',)
+
+    def __init__(self, *args, **kwargs):
+        self.as_number = kwargs.pop('as_number', False)
+        super(Arbitrary, self).__init__(*args, **kwargs)
 
     def format(self, value):
-        return text_type(Decimal(value))
+        cls = type(value)
+        if cls in integer_types:
+            # Integers and decimals are output as is (bool goes through Decimal)
+            if self.as_number and abs(value) <= MAX_FLOAT_INTEGER:
+                return value
+            return text_type(value)
+        elif cls is float and self.as_number and not (isinf(value) or isnan(value)):
+            # NaN and infinities are not JSON numbers: they are output as text below
+            return value
+        dvalue = value if cls is Decimal else Decimal(value)
+        if self.as_number and dvalue.is_finite():
+            sign, digits, exponent = dvalue.as_tuple()
+            if len(digits) <= FLOAT_DIGITS and -300 < dvalue.adjusted() < 300:
+                return float(dvalue)
+        return text_type(dvalue)
+
+    def format_many(self, values):
+        return list(map(self.format, values))
 
 
 ZERO = Decimal()
@@ -431,16 +768,70 @@ ZERO = Decimal()
 class Fixed(NumberMixin, Raw):
     '''
     A decimal number with a fixed precision.
+
+    Integers, floats (formatted with ``%f``, which rounds half to even as well)
+    and decimals already at the field precision skip the decimal quantization.
+
+    :param int decimals: The number of decimals
+    :param bool as_number: Output a JSON number instead of a string when a float holds
+        the value exactly (at most 15 significant digits), a string otherwise
+    :param Context context: The decimal context used to format the values
+        (by default a context rounding half to even, with the default precision)
     '''
-    def __init__(self, decimals=5, **kwargs):
+    __slots__ = NumberMixin.__mixin_slots__ + ('as_number', 'context', '_precision', '_places', '_limits')
+
+    def __init__(self, decimals=5, as_number=False, context=None, **kwargs):
         super(Fixed, self).__init__(**kwargs)
+        self.as_number = as_number
+        self.context = context or Context(rounding=ROUND_HALF_EVEN)
         self.precision = Decimal('0.' + '0' * (decimals - 1) + '1')
 
+    @property
+    def precision(self):
+        return self._precision
+
+    @precision.setter
+    def precision(self, precision):
+        self._precision = precision
+        self._places = -precision.as_tuple().exponent
+        # The magnitudes below which fast paths can't overflow the context precision
+        # and below which the quantized values fit in a float
+        self._limits = (10 ** (self.context.prec - self._places - 1), 10 ** (FLOAT_DIGITS - self._places))
+
     def format(self, value):
+        cls, places = type(value), self._places
+        fast_limit, float_limit = self._limits
+        if not 0 < places <= 6:
+            # Decimals are output in scientific notation below 1E-6
+            text = self.quantize(value)
+        elif cls in integer_types:
+            text = '%d.%s' % (value, '0' * places) if abs(value) < fast_limit else self.quantize(value)
+        elif cls is float:
+            # NaN and infinity fail the comparison and get rejected while quantized
+            text = '%.*f' % (places, value) if abs(value) < fast_limit else self.quantize(value)
+        elif cls is Decimal:
+            # Decimals already at the field precision are output as is
+            text = text_type(value)
+            if text[-places - 1:-places] != '.' or 'E' in text or len(text) >= self.context.prec:
+                text = self.quantize(value)
+        else:
+            text = self.quantize(value)
+
+        if self.as_number:
+            number = float(text)
+            if abs(number) < float_limit:
+                return number
+        return text
+
+    def quantize(self, value):
+        '''Round a value to the field precision, as a string'''
         dvalue = Decimal(value)
-        if not dvalue.is_normal() and dvalue != ZERO:
+        if not dvalue.is_normal(context=self.context) and dvalue != ZERO:
             raise MarshallingError('Invalid Fixed precision number.')
-        return text_type(dvalue.quantize(self.precision, rounding=ROUND_HALF_EVEN))
+        return text_type(dvalue.quantize(self.precision, rounding=ROUND_HALF_EVEN, context=self.context))
+
+    def format_many(self, values):
+        return list(map(self.format, values))
 
 
 class Boolean(Raw):
@@ -450,6 +841,7 @@ class Boolean(Raw):
     Empty collections such as ``""``, ``{}``, ``[]``, etc. will be converted to ``False``.
     '''
     __schema_type__ = 'boolean'
+    __slots__ = ()
 
     def __init__(self, *args, **kwargs):
         super(Boolean, self).__init__(*args, **kwargs)
@@ -459,6 +851,9 @@ class Boolean(Raw):
     def format(self, value):
         return bool(value)
 
+    def format_many(self, values):
+        return list(map(bool, values))
+
 
 class DateTime(MinMaxMixin, Raw):
     """
@@ -475,6 +870,7 @@ class DateTime(MinMaxMixin, Raw):
     """
     __schema_type__ = 'string'
     __schema_format__ = 'date-time'
+    __slots__ = MinMaxMixin.__mixin_slots__ + ('dt_format',)
 
     def __init__(self, dt_format='iso8601', **kwargs):
         super(DateTime, self).__init__(**kwargs)
@@ -509,6 +905,16 @@ class DateTime(MinMaxMixin, Raw):
         except (AttributeError, ValueError) as e:
             raise MarshallingError(e)
 
+    def format_many(self, values):
+        # Columns of datetimes (the common case) don't need any parsing
+        if not all(type(value) is datetime for value in values):
+            return super(DateTime, self).format_many(values)
+        elif self.dt_format == 'iso8601':
+            return list(map(self.format_iso8601, values))
+        elif self.dt_format == 'rfc822':
+            return list(map(self.format_rfc822, values))
+        raise MarshallingError('Unsupported date format %s' % self.dt_format)
+
     def format_rfc822(self, dt):
         '''
         Turn a datetime object into a formatted date.
@@ -546,6 +952,7 @@ class Date(DateTime):
     See :meth:`datetime.date.isoformat` for more info on the ISO 8601 format.
     '''
     __schema_format__ = 'date'
+    __slots__ = ()
 
     def __init__(self, **kwargs):
         kwargs.pop('dt_format', None)
@@ -565,6 +972,12 @@ class Date(DateTime):
         else:
             raise ValueError('Unsupported Date format')
 
+    def format_many(self, values):
+        # Columns of dates (the common case) don't need any parsing
+        if not all(type(value) is date for value in values):
+            return Raw.format_many(self, values)
+        return list(map(self.format_iso8601, values))
+
 
 ### URL resource
 # TODO: Adapt this to wsgiservice e.g. using the url_for implemented in the Api class
@@ -576,6 +989,8 @@ class Url(StringMixin, Raw):
     :param bool absolute: If ``True``, ensures that the generated urls will have the hostname included
     :param str scheme: URL scheme specifier (e.g. ``http``, ``https``)
     '''
+    __slots__ = StringMixin.__mixin_slots__ + ('endpoint', 'absolute', 'scheme')
+
     def __init__(self, endpoint=None, absolute=False, scheme=None, **kwargs):
         super(Url, self).__init__(**kwargs)
         self.endpoint = endpoint
@@ -606,6 +1021,8 @@ class FormattedString(StringMixin, Raw):
 
     :param str src_str: the string to format with the other values from the response.
     '''
+    __slots__ = StringMixin.__mixin_slots__ + ('src_str',)
+
     def __init__(self, src_str, **kwargs):
         super(FormattedString, self).__init__(**kwargs)
         self.src_str = text_type(src_str)
@@ -617,6 +1034,8 @@ class ClassName(String):
 
     :param bool dash: If `True`, transform CamelCase to kebab_case.
     '''
+    __slots__ = ('dash',)
+
     def __init__(self, dash=False, **kwargs):
         super(ClassName, self).__init__(**kwargs)
         self.dash = dash
@@ -639,14 +1058,22 @@ class Polymorph(Nested):
             owner: fields.Polymorph(mapping)
         })
 
+    Objects are marshalled with the model mapped to their class or, failing that,
+    to their nearest mapped base class. Resolutions are cached by class until the
+    field changes (mutating the mapping in place isn't tracked).
+
     :param dict mapping: Maps classes to their model/fields representation
     '''
+    __slots__ = ('mapping',
+                 # Cached ``(version, {class: model})`` resolutions
+                 '_dispatch')
+
     def __init__(self, mapping, mandatory=False, **kwargs):
         self.mapping = mapping
+        self._dispatch = None
         parent = self.resolve_ancestor(list(itervalues(mapping)))
         super(Polymorph, self).__init__(parent, allow_null=not mandatory, **kwargs)
 
-
     def resolve_ancestor(self, models):
         '''
         Resolve the common ancestor for all models.
@@ -654,7 +1081,7 @@ class Polymorph(Nested):
         Assume there is only one common ancestor.
         '''
         ancestors = [m.ancestors for m in models]
-        candidates = set.intersection(*ancestors)
+        candidates = set(ancestors[0]).intersection(*ancestors[1:])
         if len(candidates) != 1:
             field_names = [f.name for f in models]
             raise ValueError('Unable to determine the common ancestor for: ' + ', '.join(field_names))
@@ -662,8 +1089,36 @@ class Polymorph(Nested):
         parent_name = candidates.pop()
         return models[0].get_parent(parent_name)
 
+    def output(self, key, obj):
+        value = self.accessor(key)(obj)
+        if value is None:
+            if self.allow_null:
+                return None
+            elif self.default is not None:
+                return self.default
+            return self.marshal(value)
+        return self.marshal(value, self.model_for(type(value)))
+
+    def model_for(self, cls):
+        '''
+        Get the model to marshal instances of a class with.
+
+        :raises MarshallingError: if neither the class nor its bases are mapped
+        '''
+        dispatch = self._dispatch
+        if dispatch is None or dispatch[0] != self._version:
+            dispatch = self._dispatch = (self._version, {})
+        table = dispatch[1]
+        try:
+            model = table[cls]
+        except KeyError:
+            model = table[cls] = resolve_mapping(self.mapping, cls)
+        if model is None:
+            raise MarshallingError(ValueError('Unknown class: ' + cls.__name__))
+        return model
+
     def clone(self, mask=None):
-        data = self.__dict__.copy()
+        data = self._attributes()
         mapping = data.pop('mapping')
         for field in ('allow_null', 'model'):
             data.pop(field, None)
@@ -3,6 +3,8 @@ from __future__ import unicode_literals
 
 import re
 import socket
+import threading
+import time as clock
 
 from datetime import datetime, time, timedelta
 from email.utils import parsedate_tz, mktime_tz
@@ -10,10 +12,23 @@ from email.utils import parsedate_tz, mktime_tz
 import aniso8601
 import pytz
 
+from six import string_types
+
+from wsgiservice_restplus.errors import SpecsError
+from wsgiservice_restplus.patterns import register as register_pattern
+from wsgiservice_restplus.utils import LRUCache
+
+try:
+    from concurrent.futures import ThreadPoolExecutor
+except ImportError:  # Python 2 without the futures backport
+    ThreadPoolExecutor = None
+
 # Constants for upgrading date-based intervals to full datetimes.
 START_OF_DAY = time(0, 0, 0, tzinfo=pytz.UTC)
 END_OF_DAY = time(23, 59, 59, 999999, tzinfo=pytz.UTC)
 
+#: The URL syntax checked by :func:`url` (as a reference: it backtracks on crafted inputs,
+#: the URLs are checked by splitting them into parts matched by the ``url_*_regex`` in linear time)
 url_regex = re.compile(
     r'^(?:http|ftp)s?://'  # http:// or https://
     r'(?:[^:@]+?:[^:@]*?@|)'  # basic auth
@@ -26,6 +41,8 @@ url_regex = re.compile(
     r'(?:/?|[/?]\S+)$', re.IGNORECASE)
 
 
+#: The email syntax checked by :class:`email` (as a reference: it backtracks on crafted inputs,
+#: the emails are split by :func:`_split_email` in linear time)
 email_regex = re.compile(
     r'^'
     '(?P<local>[^@]*[^@.])'
@@ -33,8 +50,62 @@ email_regex = re.compile(
     r'(?P<server>[^@]+(?:\.[^@]+)*)'
     r'$', re.IGNORECASE)
 
+#: The maximum length of the URLs accepted by :func:`url`
+URL_MAX_LENGTH = 8192
+#: The maximum length of the email addresses accepted by :class:`email` (see RFC 5321)
+EMAIL_MAX_LENGTH = 254
+
+url_scheme_regex = re.compile(r'(?:http|ftp)s?://', re.IGNORECASE)
+url_auth_regex = re.compile(r'[^:@]+:[^:@]*@\Z')
+url_path_start_regex = re.compile(r'[/?]')
+url_path_regex = re.compile(r'(?:/?|[/?]\S+)\Z')
+url_port_regex = re.compile(r'\d+\Z')
+# Labels can't contain dots: a domain can only be matched one way (with a bounded backtracking)
+url_host_regex = re.compile(
+    r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+'
+    r'(?:[A-Z]{2,6}\.?|[A-Z0-9-]{2,}\.?)|'  # domain...
+    r'localhost|'  # localhost...
+    r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}|'  # ...or ipv4
+    r'\[?[A-F0-9]*:[A-F0-9:]+\]?)\Z', re.IGNORECASE)  # ...or ipv6
+
 time_regex = re.compile(r'\d{2}:\d{2}')
 
+#: The canonical ISO 8601 date and datetime forms, parsed without aniso8601
+iso8601_regex = re.compile(
+    r'^(\d{4})-(\d{2})-(\d{2})'  # date
+    r'(?:T(\d{2})(?::(\d{2})(?::(\d{2})(?:\.(\d{1,6}))?)?)?'  # optional time...
+    r'(Z|[+-]\d{2}(?::?\d{2})?)?)?\Z'  # ...with an optional offset
+)
+
+#: The offset of the time part of a datetime
+offset_regex = re.compile(r'[+-].+')
+
+#: The number of parsed intervals kept in cache
+INTERVAL_CACHE_SIZE = 256
+
+_intervals = LRUCache(INTERVAL_CACHE_SIZE)
+
+#: The number of domain resolutions kept in cache
+DNS_CACHE_SIZE = 4096
+#: The time (in seconds) existing domains are kept in cache
+DNS_POSITIVE_TTL = 3600
+#: The time (in seconds) missing domains are kept in cache
+DNS_NEGATIVE_TTL = 300
+#: The maximum time (in seconds) to wait for a domain resolution
+DNS_TIMEOUT = 2.0
+#: The number of threads resolving domains
+DNS_WORKERS = 4
+
+#: The separators of the Swagger ``collectionFormat`` values parsed by :class:`delimited`
+#: (``multi`` values are given as a list, one per query string occurrence)
+COLLECTION_FORMATS = {
+    'csv': ',',
+    'ssv': ' ',
+    'tsv': '\t',
+    'pipes': '|',
+    'multi': None,
+}
+
 
 def ipv4(value):
     '''Validate an IPv4 address'''
@@ -83,9 +154,9 @@ def url(value):
     :returns: The URL if valid.
     :raises: ValueError
     '''
-    if not url_regex.search(value):
+    if not _is_url(value):
         message = '{0} is not a valid URL'
-        if url_regex.search('http://' + value):
+        if _is_url('http://' + value):
             message += '. Did you mean: http://{0}'
         raise ValueError(message.format(value))
     return value
@@ -93,6 +164,150 @@ def url(value):
 url.__schema__ = {'type': 'string', 'format': 'url'}
 
 
+def _is_url(value):
+    '''
+    Whether a value matches :data:`url_regex`, in linear time: the authentication part can only
+    end at the first ``@``, the path starts at the first ``/`` or ``?`` after it and the port
+    follows the last ``:`` of the location.
+    '''
+    if len(value) > URL_MAX_LENGTH:
+        return False
+    scheme = url_scheme_regex.match(value)
+    if not scheme:
+        return False
+    rest = value[scheme.end():]
+    if rest.endswith('\n'):
+        # As matched by $
+        rest = rest[:-1]
+    at = rest.find('@')
+    if at >= 0 and url_auth_regex.match(rest[:at + 1]) and _is_location(rest[at + 1:]):
+        return True
+    return _is_location(rest)
+
+
+def _is_location(value):
+    '''Whether a value is a host (localhost, an IP address or a domain) with an optional port and path'''
+    path = url_path_start_regex.search(value)
+    index = path.start() if path else len(value)
+    if not url_path_regex.match(value, index):
+        return False
+    location = value[:index]
+    colon = location.rfind(':')
+    if colon >= 0 and url_port_regex.match(location, colon + 1) and url_host_regex.match(location[:colon]):
+        return True
+    return bool(url_host_regex.match(location))
+
+
+def _split_email(value):
+    '''
+    Split an email into its local part and server as matched by :data:`email_regex`, in linear time.
+
+    :return: The ``(local, server)`` pair or ``None`` if the value is not an email
+    '''
+    if len(value) > EMAIL_MAX_LENGTH or value.count('@') != 1:
+        return None
+    local, _, server = value.partition('@')
+    if not local or local.endswith('.') or not server:
+        return None
+    return local, server
+
+
+def resolve_domain(domain):
+    '''Whether a domain exists: the default (blocking) resolver of :class:`DomainChecker`'''
+    try:
+        socket.getaddrinfo(domain, None)
+        return True
+    except socket.error:
+        return False
+
+
+class DomainChecker(object):
+    '''
+    Check domains exist without blocking the caller longer than a timeout: the resolutions
+    run in a pool of threads and their results (positive or negative) are cached.
+
+    A resolution timing out (or failing) reports the domain as missing, without caching it.
+
+    Example::
+
+        checker = DomainChecker(resolver=lambda domain: domain == 'example.com')
+        parser.add_argument('email', type=inputs.email(check=True, checker=checker))
+
+    :param callable resolver: Whether a domain exists (blocking), :func:`resolve_domain` by default
+    :param float timeout: The maximum time (in seconds) to wait for a resolution
+    :param int positive_ttl: The time (in seconds) existing domains are kept in cache
+    :param int negative_ttl: The time (in seconds) missing domains are kept in cache
+    :param executor: The :mod:`concurrent.futures` executor running the resolutions
+        (a pool of :data:`DNS_WORKERS` threads by default, or a thread per resolution
+        when :mod:`concurrent.futures` isn't available)
+    '''
+
+    def __init__(self, resolver=resolve_domain, timeout=DNS_TIMEOUT, positive_ttl=DNS_POSITIVE_TTL,
+                 negative_ttl=DNS_NEGATIVE_TTL, executor=None, cache_size=DNS_CACHE_SIZE):
+        self.resolver = resolver
+        self.timeout = timeout
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        self._executor = executor
+        self._lock = threading.Lock()
+        self._cache = LRUCache(cache_size)
+
+    @property
+    def executor(self):
+        '''The executor running the resolutions (started on first use)'''
+        if self._executor is None and ThreadPoolExecutor is not None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(DNS_WORKERS)
+        return self._executor
+
+    def lookup(self, domain):
+        '''
+        Start the resolution of a domain.
+
+        :return: A :class:`concurrent.futures.Future` of whether the domain exists
+            (it can be awaited from asyncio with :func:`asyncio.wrap_future`)
+        '''
+        return self.executor.submit(self.resolver, domain)
+
+    def __call__(self, domain):
+        '''Whether a domain exists'''
+        cached = self._cache.get(domain)
+        if cached is not None and cached[0] > clock.time():
+            return cached[1]
+        try:
+            exists = bool(self._resolve(domain))
+        except Exception:
+            # Timeouts and resolver failures are not cached
+            return False
+        self._cache[domain] = (clock.time() + (self.positive_ttl if exists else self.negative_ttl), exists)
+        return exists
+
+    def _resolve(self, domain):
+        if self.executor is not None:
+            return self.lookup(domain).result(timeout=self.timeout)
+        result = []
+        thread = threading.Thread(target=lambda: result.append(self.resolver(domain)))
+        thread.daemon = True
+        thread.start()
+        thread.join(self.timeout)
+        if not result:
+            raise RuntimeError('Resolution of {0} timed out'.format(domain))
+        return result[0]
+
+    def clear(self):
+        '''Drop the cached resolutions'''
+        self._cache.clear()
+
+    def __deepcopy__(self, memo):
+        # The cache and the threads are shared
+        return self
+
+
+#: The default domain checker of :class:`email`
+check_domain = DomainChecker()
+
+
 class email(object):
     '''
     Validate an email.
@@ -105,18 +320,23 @@ class email(object):
     Input to the ``email`` argument will be rejected if it does not match an email
     and if domain does not exists.
 
+    The domain existence is only checked once all the other checks passed
+    (see :class:`DomainChecker`).
+
     :param bool check: Check the domain exists (perform a DNS resolution)
     :param bool ip: Allow IP (both ipv4/ipv6) as domain
     :param bool local: Allow localhost (both string or ip) as domain
     :param list|tuple domains: Restrict valid domains to this list
     :param list|tuple exclude: Exclude some domains
+    :param callable checker: Whether a domain exists (:data:`check_domain` by default)
     '''
-    def __init__(self, check=False, ip=False, local=False, domains=None, exclude=None):
+    def __init__(self, check=False, ip=False, local=False, domains=None, exclude=None, checker=None):
         self.check = check
         self.ip = ip
         self.local = local
-        self.domains = domains
-        self.exclude = exclude
+        self.domains = frozenset(domains) if domains else None
+        self.exclude = frozenset(exclude) if exclude else None
+        self.checker = checker or check_domain
 
     def error(self, value, msg=None):
         msg = msg or '{0} is not a valid email'
@@ -130,15 +350,10 @@ class email(object):
             return False
 
     def __call__(self, value):
-        match = email_regex.match(value)
-        if not match or '..' in value:
+        parts = _split_email(value)
+        if not parts or '..' in value:
             self.error(value)
-        server = match.group('server')
-        if self.check:
-            try:
-                socket.getaddrinfo(server, None)
-            except socket.error:
-                self.error(value)
+        server = parts[1]
         if self.domains and server not in self.domains:
             self.error(value, '{0} does not belong to the authorized domains')
         if self.exclude and server in self.exclude:
@@ -147,6 +362,8 @@ class email(object):
             self.error(value)
         if self.is_ip(server) and not self.ip:
             self.error(value)
+        if self.check and not self.checker(server):
+            self.error(value)
         return value
 
     @property
@@ -193,6 +410,84 @@ class regex(object):
         }
 
 
+class delimited(object):
+    '''
+    Parse a collection of values (in a Swagger ``collectionFormat``) into a list,
+    converting each item in a single pass.
+
+    Example::
+
+        @ns.query_param('ids', convert=int, collection_format='csv', max_items=100)
+        def GET(self, ids):
+            ...
+
+    The number of items is checked before the value is split: oversized collections
+    are rejected before any item is converted.
+
+    :param callable convert: Converts each item (the items are kept as strings by default)
+    :param str collection_format: One of :data:`COLLECTION_FORMATS` (``csv`` by default)
+    :param int max_items: The maximum number of items
+    :param str pattern: A regular expression each item must match (as wsgiservice ``re``)
+    :raises SpecsError: when the collection format is unknown or the pattern is invalid
+    '''
+
+    def __init__(self, convert=None, collection_format='csv', max_items=None, pattern=None, argument='argument'):
+        if collection_format not in COLLECTION_FORMATS:
+            raise SpecsError('Unknown collection format {0!r}, expected one of {1}'.format(
+                collection_format, ', '.join(sorted(COLLECTION_FORMATS))))
+        self.convert = convert
+        self.collection_format = collection_format
+        self.separator = COLLECTION_FORMATS[collection_format]
+        self.max_items = max_items
+        self.pattern = pattern
+        self.re = None if pattern is None else register_pattern('^' + pattern + '$')
+        self.argument = argument
+
+    def __call__(self, value):
+        if isinstance(value, string_types):
+            if not value:
+                return []
+            if self.separator is None:
+                items = [value]
+            else:
+                self._check_size(value.count(self.separator) + 1)
+                items = value.split(self.separator)
+        else:
+            items = value
+            self._check_size(len(items))
+
+        result = []
+        convert, search = self.convert, self.re and self.re.search
+        for index, item in enumerate(items):
+            if search and not search(item):
+                raise ValueError('Invalid {0} item {1}: {2!r} does not match pattern "{3}"'.format(
+                    self.argument, index, item, self.pattern))
+            if convert is not None:
+                try:
+                    item = convert(item)
+                except (TypeError, ValueError) as e:
+                    raise ValueError('Invalid {0} item {1}: {2}'.format(self.argument, index, e))
+            result.append(item)
+        return result
+
+    def _check_size(self, count):
+        if self.max_items is not None and count > self.max_items:
+            msg = 'Invalid {arg}: {count} items given, {arg} accepts at most {max} items'
+            raise ValueError(msg.format(arg=self.argument, count=count, max=self.max_items))
+
+    @property
+    def __schema__(self):
+        items = getattr(self.convert, '__schema__', None) or {'type': 'string'}
+        schema = {
+            'type': 'array',
+            'items': items,
+            'collectionFormat': self.collection_format,
+        }
+        if self.max_items is not None:
+            schema['maxItems'] = self.max_items
+        return schema
+
+
 def _normalize_interval(start, end, value):
     '''
     Normalize datetime intervals.
@@ -234,7 +529,7 @@ def _expand_datetime(start, value):
         # Expand a datetime based on the finest resolution provided
         # in the original input string.
         time = value.split('T')[1]
-        time_without_offset = re.sub('[+-].+', '', time)
+        time_without_offset = offset_regex.sub('', time)
         num_separators = time_without_offset.count(':')
         if num_separators == 0:
             # Hour resolution
@@ -251,16 +546,15 @@ def _expand_datetime(start, value):
 
 def _parse_interval(value):
     '''
-    Do some nasty try/except voodoo to get some sort of datetime
-    object(s) out of the string.
+    Get some sort of datetime object(s) out of the string, with the parser of its form:
+    an interval has a ``/`` separator, a datetime a ``T`` one and a date none of them.
     '''
-    try:
+    if '/' in value:
         return sorted(aniso8601.parse_interval(value))
-    except ValueError:
-        try:
-            return aniso8601.parse_datetime(value), None
-        except ValueError:
-            return aniso8601.parse_date(value), None
+    parsed = _parse_iso8601(value)
+    if 'T' in value:
+        return parsed or aniso8601.parse_datetime(value), None
+    return parsed.date() if parsed else aniso8601.parse_date(value), None
 
 
 def iso8601interval(value, argument='argument'):
@@ -286,12 +580,18 @@ def iso8601interval(value, argument='argument'):
         "2013-01-01T12:00/PT30M" -> datetime(2013, 1, 1, 12), datetime(2013, 1, 1, 12, 30)
         "2013-01-01T06:00/2013-01-01T12:00" -> datetime(2013, 1, 1, 6), datetime(2013, 1, 1, 12)
 
+    The most recently parsed intervals are kept in a bounded cache.
+
     :param str value: The ISO8601 date time as a string
     :return: Two UTC datetimes, the start and the end of the specified interval
     :rtype: A tuple (datetime, datetime)
     :raises ValueError: if the interval is invalid.
     '''
 
+    interval = _intervals.get(value)
+    if interval is not None:
+        return interval
+
     try:
         start, end = _parse_interval(value)
 
@@ -304,6 +604,7 @@ def iso8601interval(value, argument='argument'):
         msg = 'Invalid {arg}: {value}. {arg} must be a valid ISO8601 date/time interval.'
         raise ValueError(msg.format(arg=argument, value=value),)
 
+    _intervals[value] = start, end
     return start, end
 
 iso8601interval.__schema__ = {'type': 'string', 'format': 'iso8601-interval'}
@@ -423,6 +724,39 @@ def datetime_from_rfc822(value):
         raise ValueError('Invalid date literal "{0}"'.format(raw))
 
 
+def _parse_iso8601(value, utc=pytz.UTC, offset_tz=pytz.FixedOffset):
+    '''
+    Parse the canonical ISO 8601 forms (``YYYY-MM-DD`` with an optional ``THH[:MM[:SS[.ffffff]]]``
+    time and ``Z``/``+HH[:MM]`` offset) into a datetime.
+
+    :param tzinfo utc: The timezone of the ``Z`` offset
+    :param callable offset_tz: Get the timezone of the other offsets from their minutes
+    :return: A datetime or ``None`` when the value is not in a canonical form
+        (let aniso8601 handle the other forms, and the errors)
+    '''
+    match = iso8601_regex.match(value) if isinstance(value, string_types) else None
+    if match is None:
+        return None
+    year, month, day, hour, minute, second, fraction, offset = match.groups()
+    tzinfo = None
+    if offset == 'Z':
+        tzinfo = utc
+    elif offset:
+        hours, minutes = int(offset[1:3]), int(offset[-2:]) if len(offset) > 3 else 0
+        if hours > 23 or minutes > 59 or (offset[0] == '-' and not hours and not minutes):
+            # Out of range and negative zero offsets are invalid
+            return None
+        minutes += hours * 60
+        tzinfo = offset_tz(-minutes if offset[0] == '-' else minutes)
+    try:
+        return datetime(int(year), int(month), int(day),
+                        int(hour or 0), int(minute or 0), int(second or 0),
+                        int(fraction.ljust(6, '0')) if fraction else 0,
+                        tzinfo)
+    except ValueError:
+        return None
+
+
 def datetime_from_iso8601(value):
     '''
     Turns an ISO8601 formatted date into a datetime object.
@@ -437,6 +771,9 @@ def datetime_from_iso8601(value):
     :raises ValueError: if value is an invalid date literal
 
     '''
+    parsed = _parse_iso8601(value)
+    if parsed is not None:
+        return parsed
     try:
         try:
             return aniso8601.parse_datetime(value)
@@ -0,0 +1,470 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import json
+
+from collections import OrderedDict
+from copy import copy
+from functools import partial
+
+from six import iteritems
+
+from wsgiservice import raise_400
+
+from wsgiservice_restplus.fields import List, MarshallingError, Nested, Polymorph, Raw, instance, resolve_mapping
+from wsgiservice_restplus.mask import Mask, MaskError, parse as parse_mask, request_mask
+from wsgiservice_restplus.model import Model
+from wsgiservice_restplus.utils import LRUCache, wraps_with_signature
+
+__all__ = ('marshal', 'marshalled', 'stream', 'compile_plan', 'MarshalPlan')
+
+#: Approximate size (in characters) of the chunks yielded when streaming
+STREAM_CHUNK_SIZE = 16384
+#: The number of masked plans kept in cache per model (or dict of fields)
+MASKED_PLAN_CACHE_SIZE = 64
+#: The number of objects from which lists are marshalled column by column
+COLUMNAR_THRESHOLD = 32
+
+
+def marshal(data, fields, mask=None):
+    '''
+    Takes raw data (in the form of a dict, list, object) and a model (or a dict of fields)
+    to output and marshals the data through the compiled plan of the fields.
+
+    :param data: the actual object(s) from which the fields are taken from
+    :param dict fields: a model or a dict whose keys will make up the final serialized
+        response output
+    :param str|Mask mask: an optional fields mask restricting the output
+    :raises MarshallingError: In case of formatting problem
+    :raises MaskError: In case of invalid mask
+    '''
+    plan = compile_plan(fields, mask)
+    if isinstance(data, (list, tuple)):
+        return plan.many(data)
+    return plan(data)
+
+
+def stream(items, fields, chunk_size=STREAM_CHUNK_SIZE, mask=None):
+    '''
+    Marshal objects one at a time and yield them as UTF-8 encoded JSON array chunks.
+
+    Items are pulled lazily from the iterable, so the memory use doesn't depend on their
+    number and the first chunk is produced before the last item is fetched.
+
+    :param items: an iterable (e.g. a generator over a database cursor) of objects to marshal
+    :param dict fields: a model or a dict of fields
+    :param int chunk_size: the approximate size of the yielded chunks
+    :param str|Mask mask: an optional fields mask restricting the output
+    :raises MarshallingError: In case of formatting problem
+    :raises MaskError: In case of invalid mask
+    '''
+    return _stream(items, compile_plan(fields, mask), chunk_size)
+
+
+def _stream(items, plan, chunk_size=STREAM_CHUNK_SIZE):
+    encode = json.JSONEncoder().encode
+    chunk, size, separator = ['['], 1, ''
+    for item in items:
+        encoded = separator + encode(plan(item))
+        separator = ','
+        chunk.append(encoded)
+        size += len(encoded)
+        if size >= chunk_size:
+            yield ''.join(chunk).encode('utf-8')
+            chunk, size = [], 0
+    chunk.append(']')
+    yield ''.join(chunk).encode('utf-8')
+
+
+def _keep_response_header():
+    '''Replaces the wsgiservice resource hooks setting a response header from the body'''
+
+
+def marshalled(func, fields, as_list=False, streamed=False):
+    '''
+    Wrap a resource method so that its result is marshalled with the given fields.
+
+    ``None`` results are returned as is. The wrapper keeps the method signature.
+
+    The output is restricted by the fields mask of the request (see
+    :func:`~wsgiservice_restplus.mask.request_mask`), or by the model default mask.
+    An invalid mask is answered with a 400 (Bad Request).
+
+    When streamed, the resulting list is not returned but set as the response body
+    iterable (see :func:`stream`): marshalling happens while the response is sent,
+    hence a marshalling error can't change the response status anymore. The response
+    has no ``Content-MD5`` header (it would require the whole body).
+
+    :param callable func: the resource method to wrap
+    :param dict fields: a model or a dict of fields to marshal the result with
+    :param bool as_list: whether the result is an iterable of objects to marshal
+    :param bool streamed: whether to stream the resulting list
+    '''
+    if streamed and not as_list:
+        raise ValueError('Only lists can be streamed')
+    plans = LRUCache(MASKED_PLAN_CACHE_SIZE)
+    default_mask = getattr(fields, '__mask__', None)
+
+    def get_plan(mask):
+        if isinstance(fields, Model):
+            return compile_plan(fields, mask)
+        # A plain dict of fields can't tell it has changed: compile it once per mask
+        plan = plans.get(mask)
+        if plan is None:
+            plan = plans[mask] = compile_plan(fields, mask)
+        return plan
+
+    def marshal_result(*args, **kwargs):
+        result = func(*args, **kwargs)
+        if result is None:
+            return result
+        try:
+            plan = get_plan(request_mask(args[0]) or default_mask)
+        except MaskError as e:
+            raise_400(args[0], str(e))
+        if streamed:
+            resource = args[0]
+            response = resource.response
+            response.content_type = str('application/json')
+            response.content_length = None
+            response.app_iter = _stream(result, plan)
+            # wsgiservice reads the body to set these headers, which would pull the whole stream
+            resource.set_response_content_type = _keep_response_header
+            resource.set_response_content_md5 = _keep_response_header
+            return None
+        return plan.many(result) if as_list else plan(result)
+
+    return wraps_with_signature(func, marshal_result)
+
+
+def compile_plan(fields, mask=None):
+    '''
+    Get the marshalling plan of a model (compiled once and cached until the model,
+    one of its fields or one of the models it refers to changes) or of a dict of fields.
+
+    Masked plans skip the fields left out by the mask. Those of a model are kept
+    in a bounded cache keyed by mask.
+
+    :param dict fields: a model or a dict of fields
+    :param str|Mask mask: an optional fields mask
+    :rtype: MarshalPlan
+    :raises MaskError: In case of invalid mask
+    '''
+    if mask is not None and not isinstance(mask, Mask):
+        mask = parse_mask(mask)
+    if not isinstance(fields, Model):
+        return PlanCompiler().compile_root(fields, mask or None)
+    elif not mask:
+        plan = fields._marshal_plan
+        if plan is None or not plan.is_valid():
+            plan = fields._marshal_plan = PlanCompiler().compile_root(fields)
+        return plan
+
+    plans = fields._masked_plans
+    if plans is None:
+        plans = fields._masked_plans = LRUCache(MASKED_PLAN_CACHE_SIZE)
+    key = str(mask)
+    plan = plans.get(key)
+    if plan is None or not plan.is_valid():
+        plan = plans[key] = PlanCompiler().compile_root(fields, mask)
+    return plan
+
+
+class MarshalPlan(object):
+    '''
+    A compiled marshalling plan: a flat sequence of ``(key, step)`` pairs where each step
+    pulls a value from an object with a precompiled getter and outputs it through the
+    field formatter, default and mask. Nested and list plans are resolved ahead of time.
+
+    Each step also has a ``many`` attribute outputting the field of a list of objects
+    at once: large lists are marshalled column by column (each field column being
+    formatted in bulk, see :meth:`~wsgiservice_restplus.fields.Raw.format_many`),
+    then put back together into rows.
+    '''
+    __slots__ = ('steps', 'keys', 'models')
+
+    def __init__(self):
+        self.steps = ()
+        self.keys = ()
+        #: The ``(model, stamp)`` pairs the plan was compiled from
+        self.models = ()
+
+    def __call__(self, obj):
+        return {key: step(obj) for key, step in self.steps}
+
+    def many(self, items):
+        '''Marshal an iterable of objects'''
+        if not isinstance(items, list):
+            items = list(items)
+        if len(items) < COLUMNAR_THRESHOLD or not self.steps:
+            return [self(item) for item in items]
+        keys = self.keys
+        columns = [step.many(items) for _, step in self.steps]
+        return [dict(zip(keys, row)) for row in zip(*columns)]
+
+    def is_valid(self):
+        '''Whether none of the models the plan was compiled from has changed'''
+        return all(model._stamp() == stamp for model, stamp in self.models)
+
+
+def _function(method):
+    return getattr(method, '__func__', method)
+
+
+def _overrides(field, name, base=Raw):
+    '''Whether the field class overrides a method of the given base class'''
+    return _function(getattr(type(field), name)) is not _function(getattr(base, name))
+
+
+def _defining_class(cls, name):
+    for klass in cls.__mro__:
+        if name in klass.__dict__:
+            return klass
+
+
+def _formats_many(field):
+    '''Whether the field bulk formatting is consistent with its formatting (not overridden below it)'''
+    cls = type(field)
+    return issubclass(_defining_class(cls, 'format_many'), _defining_class(cls, 'format'))
+
+
+def _per_object(step):
+    '''Give a step the default ``many`` implementation: one object at a time'''
+    def many(objs):
+        return [step(obj) for obj in objs]
+    step.many = many
+    return step
+
+
+class PlanCompiler(object):
+    '''
+    Compiles the marshalling plans of a model and of the models it refers to
+    (recursive references are compiled once).
+    '''
+
+    def __init__(self):
+        self.plans = {}
+        self.models = []
+
+    def compile_root(self, fields, mask=None):
+        plan = self.compile(fields, mask)
+        plan.models = tuple(self.models)
+        return plan
+
+    def compile(self, fields, mask=None):
+        key = (id(fields), id(mask))
+        if key in self.plans:
+            return self.plans[key]
+        plan = self.plans[key] = MarshalPlan()
+        if isinstance(fields, Model):
+            self.models.append((fields, fields._stamp()))
+            fields = self.resolve(fields)
+        plan.steps = tuple(
+            (name, self.compile_field(name, instance(field), mask=submask))
+            for name, field, submask in self.select(fields, mask)
+        )
+        plan.keys = tuple(name for name, _ in plan.steps)
+        return plan
+
+    def select(self, fields, mask):
+        '''Yield the ``(name, field, mask)`` of the fields selected by the mask'''
+        for name, field in iteritems(fields):
+            if mask is None or '*' in mask and name not in mask:
+                yield name, field, None
+            elif name in mask:
+                yield name, field, mask[name] if isinstance(mask[name], Mask) else None
+
+    def resolve(self, model):
+        '''
+        Resolve the model fields like :attr:`Model.resolved` does, but without copying them:
+        the plan has to refer to the actual nested models (which may be recursive).
+        '''
+        fields = OrderedDict(model)
+        for parent in model.__parents__:
+            fields.update(self.resolve(parent))
+        for name, field in iteritems(fields):
+            if not isinstance(field, type) and getattr(field, 'discriminator', None):
+                # Ensure discriminator always output the model name
+                fields[name] = copy(field)
+                fields[name].default = model.name
+        return fields
+
+    def getter(self, key, field):
+        '''Get the compiled getter pulling the field value from an object'''
+        return field.accessor(key)
+
+    def compile_field(self, key, field, getter=None, mask=None):
+        '''Compile the step outputting a field from an object'''
+        if isinstance(field, Polymorph):
+            return self.compile_polymorph(field, getter or self.getter(key, field), mask)
+        elif isinstance(field, Nested):
+            return self.compile_nested(field, getter or self.getter(key, field), mask)
+        elif isinstance(field, List):
+            return self.compile_list(field, getter or self.getter(key, field), mask)
+        elif mask is not None:
+            raise MaskError('Mask is inconsistent with model')
+        elif getter is None and _overrides(field, 'output'):
+            # Custom output: no way to compile it
+            return _per_object(partial(field.output, key))
+        return self.compile_raw(field, getter or self.getter(key, field))
+
+    def compile_item(self, container, mask=None):
+        '''Compile the output of a list element (its container attribute, as for :meth:`List.format`)'''
+        getter = _identity
+        if container.attribute is not None and not isinstance(container, Nested) and type(container) is not Raw:
+            getter = container.accessor()
+        return self.compile_field(None, container, getter=getter, mask=mask)
+
+    def compile_raw(self, field, getter):
+        formatter = self.compile_formatter(field)
+        formatter_many = self.compile_formatter_many(field)
+        default, dynamic_default = field.default, callable(field.default)
+        mask = field.mask if callable(field.mask) else None
+
+        def output(value):
+            if value is None:
+                value = default() if dynamic_default else default
+                return formatter(value) if value else value
+            value = formatter(value)
+            return mask(value) if mask else value
+
+        def step(obj):
+            value = getter(obj)
+            if value is None:
+                value = default() if dynamic_default else default
+                return formatter(value) if value else value
+            value = formatter(value)
+            return mask(value) if mask else value
+
+        def many(objs):
+            values = [getter(obj) for obj in objs]
+            if None in values:
+                # Defaults are handled one value at a time
+                return [output(value) for value in values]
+            values = formatter_many(values)
+            return [mask(value) for value in values] if mask else values
+
+        step.many = many
+        return step
+
+    def compile_formatter(self, field):
+        '''Compile a formatter raising :class:`MarshallingError` only'''
+        if not _overrides(field, 'format'):
+            return _identity
+        fmt = field.format
+
+        def formatter(value):
+            try:
+                return fmt(value)
+            except MarshallingError:
+                raise
+            except Exception as e:
+                raise MarshallingError(e)
+        return formatter
+
+    def compile_formatter_many(self, field):
+        '''Compile a column formatter raising :class:`MarshallingError` only'''
+        if not _overrides(field, 'format'):
+            return _identity
+        elif _formats_many(field):
+            fmt = field.format_many
+        else:
+            fmt = partial(Raw.format_many, field)
+
+        def formatter(values):
+            try:
+                return fmt(values)
+            except MarshallingError:
+                raise
+            except Exception as e:
+                raise MarshallingError(e)
+        return formatter
+
+    def compile_nested(self, field, getter, mask=None):
+        plan = self.compile(field.model, mask)
+        allow_null, default, as_list = field.allow_null, field.default, field.as_list
+
+        def output(value):
+            if value is None:
+                if allow_null:
+                    return None
+                elif default is not None:
+                    return default
+                elif as_list:
+                    return []
+            return plan.many(value) if as_list else plan(value)
+
+        def step(obj):
+            return output(getter(obj))
+
+        def many(objs):
+            values = [getter(obj) for obj in objs]
+            if as_list or None in values:
+                return [output(value) for value in values]
+            return plan.many(values)
+
+        step.many = many
+        return step
+
+    def compile_polymorph(self, field, getter, mask=None):
+        parent = self.compile(field.model, mask)
+        plans = dict((cls, self.compile(model, mask)) for cls, model in iteritems(field.mapping))
+        # Plans by exact class, completed with the subclasses as they are met
+        dispatch = dict(plans)
+        allow_null, default = field.allow_null, field.default
+
+        def plan_for(cls):
+            try:
+                plan = dispatch[cls]
+            except KeyError:
+                plan = dispatch[cls] = resolve_mapping(plans, cls)
+            if plan is None:
+                raise MarshallingError(ValueError('Unknown class: ' + cls.__name__))
+            return plan
+
+        def output_null():
+            if allow_null:
+                return None
+            elif default is not None:
+                return default
+            return parent(None)
+
+        def step(obj):
+            value = getter(obj)
+            if value is None:
+                return output_null()
+            return plan_for(type(value))(value)
+
+        def many(objs):
+            # Marshal the values of each class together
+            values = [getter(obj) for obj in objs]
+            groups = OrderedDict()
+            for index, value in enumerate(values):
+                groups.setdefault(None if value is None else type(value), []).append(index)
+            output = [None] * len(values)
+            for cls, indexes in iteritems(groups):
+                if cls is None:
+                    marshalled = [output_null() for _ in indexes]
+                else:
+                    marshalled = plan_for(cls).many([values[index] for index in indexes])
+                for index, data in zip(indexes, marshalled):
+                    output[index] = data
+            return output
+
+        step.many = many
+        return step
+
+    def compile_list(self, field, getter, mask=None):
+        items = self.compile_item(field.container, mask).many
+        default, dynamic_default = field.default, callable(field.default)
+
+        def step(obj):
+            value = getter(obj)
+            if value is None:
+                return default() if dynamic_default else default
+            return items(value)
+        return _per_object(step)
+
+
+def _identity(value):
+    return value
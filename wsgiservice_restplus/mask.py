@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import re
+
+from collections import Mapping, OrderedDict
+
+import six
+
+from wsgiservice_restplus.errors import RestError
+from wsgiservice_restplus.utils import LRUCache
+
+__all__ = ('Mask', 'MaskError', 'ParseError', 'apply', 'parse', 'request_mask', 'MASK_HEADER', 'MASK_PARAM')
+
+#: The request header holding the fields mask
+MASK_HEADER = 'X-Fields'
+#: The query string parameter holding the fields mask (used when the header is missing)
+MASK_PARAM = 'fields'
+#: The number of parsed masks kept in cache
+MASK_CACHE_SIZE = 512
+
+TOKENS_RE = re.compile(r'(?P<name>[\w:\-*]+)|(?P<space>\s+)|(?P<token>.)', re.UNICODE)
+
+_masks = LRUCache(MASK_CACHE_SIZE)
+
+
+class MaskError(RestError):
+    '''Raised when a mask error occurs'''
+    pass
+
+
+class ParseError(MaskError):
+    '''Raised when the mask parsing failed'''
+    pass
+
+
+class Mask(OrderedDict):
+    '''
+    Hold a parsed mask: an ordered mapping of field names to either ``True``
+    or the :class:`Mask` of their nested fields.
+
+    A ``*`` token selects all the fields not explicitly listed.
+
+    :param mask: the mask string to parse (eg. ``{name,address{city},*}``) or a mapping
+    :param bool skip: skip missing fields when applied to data
+    '''
+
+    def __init__(self, mask=None, skip=False, **kwargs):
+        self.skip = skip
+        if isinstance(mask, six.string_types):
+            super(Mask, self).__init__()
+            self.parse(mask)
+        elif isinstance(mask, Mapping):
+            super(Mask, self).__init__(mask, **kwargs)
+        else:
+            super(Mask, self).__init__(**kwargs)
+
+    def parse(self, mask):
+        '''
+        Parse a fields mask.
+        Expect something in the form::
+
+            {field,nested{nested_field,another},last}
+
+        External brackets are optionals so it can also be written::
+
+            field,nested{nested_field,another},last
+
+        :param str mask: the mask string to parse
+        :raises ParseError: when a mask is unparseable/invalid
+        '''
+        mask = self.clean(mask)
+        if not mask:
+            return
+
+        fields = self
+        previous = None
+        stack = []
+
+        for match in TOKENS_RE.finditer(mask):
+            token = match.group()
+            if match.lastgroup == 'space':
+                continue
+            elif match.lastgroup == 'name':
+                fields[token] = True
+            elif token == '{':
+                if previous not in fields:
+                    raise ParseError('Unexpected opening bracket')
+                fields[previous] = Mask(skip=self.skip)
+                stack.append(fields)
+                fields = fields[previous]
+            elif token == '}':
+                if not stack or previous in (',', '{'):
+                    raise ParseError('Unexpected closing bracket')
+                fields = stack.pop()
+            elif token == ',':
+                if previous in (',', '{', None):
+                    raise ParseError('Unexpected comma')
+            else:
+                raise ParseError('Unexpected character: {0}'.format(token))
+            previous = token
+
+        if stack:
+            raise ParseError('Missing closing bracket')
+
+    def clean(self, mask):
+        '''Remove unnecessary characters'''
+        mask = mask.replace('\n', '').strip()
+        # External brackets are optional
+        if mask and mask[0] == '{':
+            if mask[-1] != '}':
+                raise ParseError('Missing closing bracket')
+            mask = mask[1:-1]
+        return mask
+
+    def apply(self, data):
+        '''
+        Apply a fields mask to the data.
+
+        :param data: the data, the model, the dict of fields or the field to filter
+        :raises MaskError: when the mask is inconsistent with the data
+        '''
+        from wsgiservice_restplus import fields
+
+        # Should handle lists
+        if isinstance(data, (list, tuple, set)):
+            return [self.apply(d) for d in data]
+        elif isinstance(data, (fields.Nested, fields.List, fields.Polymorph)):
+            return data.clone(self)
+        elif isinstance(data, fields.Raw):
+            raise MaskError('Mask is inconsistent with model')
+        elif isinstance(data, Mapping):
+            return self.filter_data(getattr(data, 'resolved', data))
+        return data
+
+    def filter_data(self, data):
+        '''
+        Handle the data filtering given a parsed mask
+
+        :param dict data: the raw data to filter
+        '''
+        out = OrderedDict()
+        for field, content in six.iteritems(self):
+            if field == '*':
+                continue
+            elif isinstance(content, Mask):
+                nested = data.get(field, None)
+                if self.skip and nested is None:
+                    continue
+                elif nested is None:
+                    out[field] = None
+                else:
+                    out[field] = content.apply(nested)
+            elif field in data or not self.skip:
+                out[field] = data.get(field, None)
+
+        if '*' in self:
+            for key, value in six.iteritems(data):
+                if key not in out:
+                    out[key] = value
+        return out
+
+    def __str__(self):
+        return '{{{0}}}'.format(','.join(
+            field + (str(content) if isinstance(content, Mask) else '')
+            for field, content in six.iteritems(self)
+        ))
+
+
+def parse(mask):
+    '''
+    Get the parsed :class:`Mask` of a mask string.
+
+    Parsed masks are kept in a bounded cache: they must not be modified.
+
+    :param str mask: the mask string to parse
+    :raises ParseError: when the mask is unparseable/invalid
+    '''
+    parsed = _masks.get(mask)
+    if parsed is None:
+        parsed = _masks[mask] = Mask(mask)
+    return parsed
+
+
+def apply(data, mask, skip=False):
+    '''
+    Apply a fields mask to the data.
+
+    :param data: The data or model to apply mask on
+    :param str|Mask mask: the mask (parsed or not) to apply on data
+    :param bool skip: If true, missing field won't appear in result
+    :raises MaskError: when the mask is inconsistent with the data
+    '''
+    return Mask(mask, skip).apply(data)
+
+
+def request_mask(resource):
+    '''
+    Get the fields mask requested on a resource, from the :data:`MASK_HEADER` header
+    or the :data:`MASK_PARAM` query string parameter.
+
+    :param resource: the resource instance handling the request
+    :rtype: str or None
+    '''
+    request = getattr(resource, 'request', None)
+    if request is None:
+        return None
+    return request.headers.get(MASK_HEADER) or request.GET.get(MASK_PARAM) or None
@@ -3,34 +3,70 @@ from __future__ import unicode_literals
 
 import copy
 import re
+import threading
 import warnings
 from collections import MutableMapping
+from collections import OrderedDict
 
 from jsonschema import Draft4Validator
 from jsonschema.exceptions import ValidationError
 from six import iteritems
 from six import itervalues
 
+from wsgiservice_restplus.fields import instance
 from wsgiservice_restplus.utils import format_definition_reference
 from wsgiservice_restplus.utils import not_none
+from wsgiservice_restplus.utils import LRUCache
+from wsgiservice_restplus.utils import touch_documentation
+
+#: The engines validating the models: jsonschema's ``Draft4Validator`` or validators
+#: generated as Python source (see :func:`~wsgiservice_restplus.validation.compile_schema`)
+VALIDATOR_ENGINES = ('jsonschema', 'compiled')
+
+#: The number of validators (by engine, resolver and format checker) kept in cache per model and thread
+VALIDATOR_CACHE_SIZE = 8
 
 RE_REQUIRED = re.compile(r'u?\'(?P<name>.*)\' is a required property', re.I | re.U)
 
 
-def instance(cls):
-    if isinstance(cls, type):
-        return cls()
-    return cls
+def field_stamp(field):
+    '''Identify the current state of a field (class or instance)'''
+    if isinstance(field, type):
+        return field
+    stamp = getattr(field, '_stamp', None)
+    return stamp() if stamp else id(field)
 
 
 class Model(dict, MutableMapping):
     """
     A thin wrapper on dict to store API doc metadata.
 
+    Mutations through the dict API are tracked so that values derived from the model
+    (and its ancestors) can be cached until it changes.
+
     :param str name: The model public name
     :param str mask: an optional default model mask
     """
 
+    #: The engine of the model validators (one of :data:`VALIDATOR_ENGINES`), set by the :class:`Api`
+    validator_engine = 'jsonschema'
+    #: Incremented on each mutation through the dict API
+    _version = 0
+    #: Cached ``(stamp, resolved model)`` pair
+    _resolved = None
+    #: Cached ``(stamp, schema)`` pair
+    _schema_cache = None
+    #: Thread local (and bounded) caches of compiled validators
+    _validators = None
+    #: Cached marshalling plan (see :mod:`~wsgiservice_restplus.marshalling`)
+    _marshal_plan = None
+    #: Bounded cache of the masked marshalling plans
+    _masked_plans = None
+    #: Cached ``(key, ancestors)`` pair
+    _ancestors = None
+    #: Cached payload validator (see :mod:`~wsgiservice_restplus.validation`)
+    _payload_validator = None
+
     def __init__(self, name, *args, **kwargs):
         self.__apidoc__ = {
             'name': name
@@ -50,11 +86,77 @@ class Model(dict, MutableMapping):
         self.inherit = instance_inherit
 
 
+    def __setitem__(self, key, value):
+        super(Model, self).__setitem__(key, value)
+        self._touch()
+
+    def __delitem__(self, key):
+        super(Model, self).__delitem__(key)
+        self._touch()
+
+    def update(self, *args, **kwargs):
+        super(Model, self).update(*args, **kwargs)
+        self._touch()
+
+    def setdefault(self, key, default=None):
+        value = super(Model, self).setdefault(key, default)
+        self._touch()
+        return value
+
+    def pop(self, *args):
+        value = super(Model, self).pop(*args)
+        self._touch()
+        return value
+
+    def popitem(self):
+        item = super(Model, self).popitem()
+        self._touch()
+        return item
+
+    def clear(self):
+        super(Model, self).clear()
+        self._touch()
+
+    def _touch(self):
+        '''Invalidate the values cached from this model'''
+        self._version += 1
+        touch_documentation()
+
+    def _stamp(self):
+        '''
+        Identify the current state of the model, of its fields and of its ancestors
+        (a cached value is still valid as long as the stamp is the same).
+        '''
+        return (
+            self._version,
+            tuple(field_stamp(field) for field in itervalues(self)),
+            tuple((id(parent), parent._stamp()) for parent in self.__parents__),
+        )
+
+    def __getstate__(self):
+        # Caches are not part of the model state: don't copy (or pickle) them along
+        state = self.__dict__.copy()
+        state.pop('_resolved', None)
+        state.pop('_schema_cache', None)
+        state.pop('_validators', None)
+        state.pop('_marshal_plan', None)
+        state.pop('_masked_plans', None)
+        state.pop('_ancestors', None)
+        state.pop('_payload_validator', None)
+        return state
+
     @property
     def resolved(self):
         '''
         Resolve real fields before submitting them to marshal
+
+        The resolved model is cached until this model or one of its ancestors is modified
+        and must not be modified itself.
         '''
+        stamp = self._stamp()
+        if self._resolved is not None and self._resolved[0] == stamp:
+            return self._resolved[1]
+
         # Duplicate fields
         resolved = copy.deepcopy(self)
 
@@ -63,23 +165,34 @@ class Model(dict, MutableMapping):
             resolved.update(parent.resolved)
 
         # Handle discriminator
-        candidates = [f for f in itervalues(resolved) if getattr(f, 'discriminator', None)]
+        candidates = [(n, f) for n, f in iteritems(resolved)
+                      if not isinstance(f, type) and getattr(f, 'discriminator', None)]
         # Ensure the is only one discriminator
         if len(candidates) > 1:
             raise ValueError('There can only be one discriminator by schema')
         # Ensure discriminator always output the model name
         elif len(candidates) == 1:
-            candidates[0].default = self.name
+            # The field may come from a (cached) parent resolution: don't alter it
+            name, field = candidates[0]
+            resolved[name] = copy.copy(field)
+            resolved[name].default = self.name
 
+        self._resolved = (stamp, resolved)
         return resolved
 
     @property
     def ancestors(self):
         '''
-        Return the ancestors tree
+        Return the ancestors tree (the names of the model and of its ancestors), as a frozenset
+        cached until the model name or its parents ancestors change
         '''
-        ancestors = [p.ancestors for p in self.__parents__]
-        return set.union(set([self.name]), *ancestors)
+        parents = tuple(p.ancestors for p in self.__parents__)
+        key = (self.name, parents)
+        if self._ancestors is not None and self._ancestors[0] == key:
+            return self._ancestors[1]
+        ancestors = frozenset([self.name]).union(*parents)
+        self._ancestors = (key, ancestors)
+        return ancestors
 
     def get_parent(self, name):
         if self.name == name:
@@ -93,12 +206,22 @@ class Model(dict, MutableMapping):
 
     @property
     def __schema__(self):
+        '''
+        The model JSON schema, cached until the model or one of its fields changes.
+        It is computed on each access when a field schema is dynamic.
+        '''
+        stamp = (self._stamp(), self.__mask__)
+        if self._schema_cache is not None and self._schema_cache[0] == stamp:
+            return self._schema_cache[1]
+
         properties = {}
         required = set()
         discriminator = None
+        dynamic = False
         for name, field in iteritems(self):
             field = instance(field)
             properties[name] = field.__schema__
+            dynamic = dynamic or getattr(field, '_dynamic', True)
             if field.required:
                 required.add(name)
             if getattr(field, 'discriminator', False):
@@ -118,11 +241,12 @@ class Model(dict, MutableMapping):
                 for parent in self.__parents__
             ]
 
-            return {
+            schema = {
                 'allOf': refs + [schema]
             }
-        else:
-            return schema
+
+        self._schema_cache = None if dynamic else (stamp, schema)
+        return schema
 
     def extend(self, name, fields):
         '''
@@ -172,15 +296,78 @@ class Model(dict, MutableMapping):
         model.__parents__ = parents[:-1]
         return model
 
+    def validator(self, resolver=None, format_checker=None):
+        '''
+        Get a compiled validator for the model schema.
+
+        Validators are cached by schema version, engine, resolver and format checker. The cache is
+        thread local as validating references keeps state in the resolver, and bounded (see
+        :data:`VALIDATOR_CACHE_SIZE`) as callers may build a new resolver for each validation.
+
+        :param RefResolver resolver: An optional JSON schema reference resolver
+        :param FormatChecker format_checker: An optional format checker
+        :rtype: Draft4Validator or CompiledValidator
+        '''
+        schema = self.__schema__
+        if self._validators is None:
+            self._validators = threading.local()
+        cache = getattr(self._validators, 'cache', None)
+        if cache is None:
+            cache = self._validators.cache = LRUCache(VALIDATOR_CACHE_SIZE)
+
+        # Entries hold the resolver and format checker so that their ids can't be reused
+        key = (self.validator_engine, id(resolver), id(format_checker))
+        entry = cache.get(key)
+        if entry is None or entry[0] is not schema:
+            if self.validator_engine == 'compiled':
+                from wsgiservice_restplus.validation import compile_schema
+                validator = compile_schema(schema, resolver=resolver, format_checker=format_checker)
+            else:
+                validator = Draft4Validator(schema, resolver=resolver, format_checker=format_checker)
+            entry = cache[key] = (schema, resolver, format_checker, validator)
+        return entry[3]
+
     def validate(self, data, resolver=None, format_checker=None):
 
-        validator = Draft4Validator(self.__schema__, resolver=resolver, format_checker=format_checker)
+        validator = self.validator(resolver=resolver, format_checker=format_checker)
 
         try:
             validator.validate(data)
         except ValidationError:
             raise
 
+    def validate_many(self, items, max_errors=None, resolver=None, format_checker=None):
+        '''
+        Validate a batch of payloads in one pass with a single compiled validator.
+
+        Each payload reports a single error (the first one) per key.
+
+        :param items: The payloads to validate
+        :param int max_errors: Stop validating as soon as this number of errors (of distinct keys)
+            is reached
+        :param RefResolver resolver: An optional JSON schema reference resolver
+        :param FormatChecker format_checker: An optional format checker
+        :returns: The errors (as formatted by :meth:`format_error`) of each invalid payload, by index
+        :rtype: OrderedDict
+        :raises ValueError: when ``max_errors`` is not positive
+        '''
+        if max_errors is not None and max_errors <= 0:
+            raise ValueError('max_errors must be positive, got {0}'.format(max_errors))
+        errors = OrderedDict()
+        validator = self.validator(resolver=resolver, format_checker=format_checker)
+        count = 0
+        for index, item in enumerate(items):
+            for error in validator.iter_errors(item):
+                key, message = self.format_error(error)
+                item_errors = errors.setdefault(index, {})
+                if key in item_errors:
+                    continue
+                item_errors[key] = message
+                count += 1
+                if max_errors is not None and count >= max_errors:
+                    return errors
+        return errors
+
     def format_error(self, error):
         path = list(error.path)
         if error.validator == 'required':
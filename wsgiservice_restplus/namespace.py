@@ -6,8 +6,15 @@ import six
 import warnings
 
 from inspect import isclass
+from wsgiservice_restplus.converters import Boolean as BooleanConverter
+from wsgiservice_restplus.fields import instance
+from wsgiservice_restplus.inputs import delimited
+from wsgiservice_restplus.marshalling import marshalled
+from wsgiservice_restplus.mask import MASK_HEADER
 from wsgiservice_restplus.model import Model
-from wsgiservice_restplus.utils import merge
+from wsgiservice_restplus.patterns import register as register_pattern
+from wsgiservice_restplus.utils import getargspec, merge, touch_documentation
+from wsgiservice_restplus.validation import collected, validated
 
 from wsgiservice_restplus.wsgiservice_adaptors import get_resource_http_methods
 
@@ -95,6 +102,7 @@ class Namespace(object):
 
         if doc is False:
             cls.__apidoc__ = False
+            touch_documentation()
             return
         unshortcut_params_description(doc)
         handle_deprecations(doc)
@@ -108,6 +116,7 @@ class Namespace(object):
                     if 'expect' in doc[http_method] and not isinstance(doc[http_method]['expect'], (list, tuple)):
                         doc[http_method]['expect'] = [doc[http_method]['expect']]
         cls.__apidoc__ = merge(getattr(cls, '__apidoc__', {}), doc)
+        touch_documentation()
 
     def doc(self, shortcut=None, **kwargs):
         """A decorator to add some api documentation to the decorated object"""
@@ -131,7 +140,8 @@ class Namespace(object):
     def add_model(self, name, definition):
         self.models[name] = definition
         for api in self.apis:
-            api.models[name] = definition
+            api.register_model(name, definition)
+            api.invalidate_schema()
         return definition
 
     def model(self, name=None, model=None, mask=None, **kwargs):
@@ -199,7 +209,12 @@ class Namespace(object):
 
     def payload_model(self, *models):
         """A decorator that adds payload parameters model data to swagger api documentation as well as
-        applies wsgiservice validation using the model object provided.
+        validates the request payload against the model object(s) provided.
+
+        Each model is compiled once into a validator resolving its nested models, with the validator
+        engine of the API (see :mod:`~wsgiservice_restplus.validation`): invalid payloads are answered
+        with a 400 response listing the errors by field path. The wsgiservice ``_validations`` of the fields
+        are only used to convert the parameters passed to the method.
 
         :param models: model(s) objects to extract api information from on request payload model
         """
@@ -218,6 +233,7 @@ class Namespace(object):
 
         def wrapper(documented):
 
+            documented = validated(documented, models, self)
             if not hasattr(documented, '_validations'):
                 documented._validations = {}
             documented._validations.update(validations)
@@ -231,6 +247,8 @@ class Namespace(object):
         """Generates the content of the _validations dictionary (normally used by validate decorator \
         from wsgiservice.decorators) from a single Model object.
 
+        The payload is validated as a whole by :meth:`payload_model`: the parameters are only converted.
+
         :param model: instance of the
         :return: validations dictionary (equivalent to _validations from validate decorator from wsgiservice)
         :rtype: dict
@@ -239,11 +257,12 @@ class Namespace(object):
         validations = {}
 
         for field_name, field in six.iteritems(model):
+            field = instance(field)
             validations[field_name] = {
-                're': field.valid_params.get('re', None),
+                're': None,
                 'convert': field.valid_params.get('convert', None),
                 'doc': field.valid_params.get('doc', None),
-                'mandatory': field.valid_params.get('mandatory', False),
+                'mandatory': False,
             }
 
         return validations
@@ -254,13 +273,20 @@ class Namespace(object):
         return field
 
 
-    def marshal_with(self, fields, as_list=False, code=200, description=None, **kwargs):
+    def marshal_with(self, fields, as_list=False, code=200, description=None, stream=False, **kwargs):
         """
         A decorator to specify the returned response object values: attaches __apidoc__ attribute
-        to the decorated class or method.
+        to the decorated method and marshals its result through the compiled plan of the fields
+        (see :func:`~wsgiservice_restplus.marshalling.marshal`).
 
-        :param bool as_list: Indicate that the return type is a list (for the documentation)
+        The output can be restricted by a fields mask given in the ``X-Fields`` header
+        (or the ``fields`` query string parameter), eg. ``{name,address{city}}``.
+
+        :param dict fields: The model (or dict of fields) to marshal the result with
+        :param bool as_list: Indicate that the return type is a list
         :param int code: Optionally give the expected HTTP response code if its different from 200
+        :param bool stream: Stream the returned iterable as a JSON array body
+            (see :func:`~wsgiservice_restplus.marshalling.stream`), only valid for lists
         """
 
         def wrapper(func):
@@ -268,7 +294,16 @@ class Namespace(object):
                 'responses': {
                     code: (description, [fields]) if as_list else (description, fields)
                 },
+                'params': {
+                    MASK_HEADER: {
+                        'in': 'header',
+                        'type': 'string',
+                        'format': 'mask',
+                        'description': 'An optional fields mask',
+                    }
+                },
             }
+            func = marshalled(func, fields, as_list=as_list, streamed=stream)
             func.__apidoc__ = merge(getattr(func, '__apidoc__', {}), doc)
             return func
 
@@ -308,7 +343,8 @@ class Namespace(object):
         return self.doc(params={name: param})
 
 
-    def valid_param(self, name, doc='', _in='query', re=None, convert=None, mandatory=True, **kwargs):
+    def valid_param(self, name, doc='', _in='query', re=None, convert=None, mandatory=True,
+                    collection_format=None, max_items=None, **kwargs):
         """
         A decorator to specify one of the expected parameters and append validation conditions \
         for wsgiservice. This is a hybryd decorator made from self.param, self.doc and \
@@ -327,8 +363,20 @@ class Namespace(object):
         :type convert: callable or type (eg. int, str, bool, etc.)
         :param mandatory: Whether the parameter is mandatory. By default this is `True`.
         :type mandatory: bool
+        :param str collection_format: Parse the parameter as a list of values in this Swagger
+                    ``collectionFormat`` `(csv|ssv|tsv|pipes|multi)`. Each item is matched against
+                    ``re`` and converted by ``convert``. It is ``csv`` by default when ``max_items`` is set
+                    or when the ``type`` is a list (eg. ``type=[int]``, whose items are converted
+                    to ``int`` unless ``convert`` is given).
+        :param int max_items: The maximum number of items of a collection, checked before any
+                    item is converted.
+        :raises SpecsError: when the regular expression is invalid or prone to catastrophic backtracking
+                    or when the collection format is unknown
         """
 
+        if re is not None:
+            register_pattern(re)
+
         param = kwargs
         param['required'] = mandatory
         param['in'] = _in
@@ -339,13 +387,39 @@ class Namespace(object):
         elif hasattr(convert, "converts_to_type"):
             param['type'] = eval(convert.converts_to_type)
 
+        parse = None
+        item_type = param.get('type', 'string')
+        if isinstance(item_type, (list, tuple)):
+            # eg. ``type=[int]``: the items are converted to the type they are documented with
+            item_type = item_type[0]
+            if convert is None and isinstance(item_type, type):
+                convert = BooleanConverter if item_type is bool else item_type
+            collection_format = collection_format or 'csv'
+        if collection_format is not None or max_items is not None:
+            parse = delimited(convert, collection_format or 'csv', max_items=max_items, pattern=re, argument=name)
+            # Items are checked and converted by the parser
+            re, convert = None, parse
+            param['type'] = [item_type]
+            param['collectionFormat'] = parse.collection_format
+            if max_items is not None:
+                param['maxItems'] = max_items
+
         api_params = {'params': {name: param}}
 
         def wrapper(documented):
 
+            # Collections are parsed by the method wrapper, so that their errors are reported alike
+            if parse is not None and inspect.isfunction(documented) and name in getargspec(documented).args:
+                # wsgiservice only passes the last occurrence of a parameter: collect them all
+                multi = parse.separator is None and _in == 'query'
+                documented = collected(documented, name, parse, multi)
+                validation_convert = None
+            else:
+                validation_convert = convert
+
             if not hasattr(documented, '_validations'):
                 documented._validations = {}
-            documented._validations[name] = {'re': re, 'convert': convert, 'doc': doc, 'mandatory': mandatory}
+            documented._validations[name] = {'re': re, 'convert': validation_convert, 'doc': doc, 'mandatory': mandatory}
 
             self._handle_api_doc(documented, api_params)
             return documented
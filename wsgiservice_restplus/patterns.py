@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import re
+
+from wsgiservice_restplus.errors import SpecsError
+
+try:
+    from re import _constants as sre_constants, _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_constants
+    import sre_parse
+
+__all__ = ('register', 'is_catastrophic')
+
+REPEATS = (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT)
+GROUPS = (sre_constants.SUBPATTERN, sre_constants.BRANCH)
+
+#: The compiled regular expressions by pattern
+_patterns = {}
+
+
+def register(pattern):
+    '''
+    Get the compiled regular expression of a field pattern or of a wsgiservice ``re``.
+
+    Each distinct pattern is compiled once (on registration, when the field or the parameter
+    is declared) and shared by the documentation and the validators.
+
+    :param str pattern: the regular expression
+    :raises SpecsError: when the pattern is invalid or prone to catastrophic backtracking
+    '''
+    regex = _patterns.get(pattern)
+    if regex is None:
+        try:
+            regex = re.compile(pattern)
+        except (re.error, TypeError) as e:
+            raise SpecsError('Invalid pattern {0!r}: {1}'.format(pattern, e))
+        if is_catastrophic(pattern):
+            raise SpecsError('Pattern {0!r} is prone to catastrophic backtracking'.format(pattern))
+        _patterns[pattern] = regex
+    return regex
+
+
+def is_catastrophic(pattern):
+    '''
+    Whether a pattern is prone to catastrophic backtracking: an unbounded repeat iterating over
+    another unbounded repeat with nothing else required in between (eg. ``(a+)+`` or ``(\\w+\\s?)*``)
+    takes an exponential time to reject some inputs.
+
+    Overlapping alternatives (eg. ``(a|aa)*``) are not detected.
+
+    :param str pattern: the regular expression
+    '''
+    return _nested_repeat(sre_parse.parse(pattern))
+
+
+def _subpatterns(av):
+    '''The subpatterns of the arguments of a parsed item'''
+    for arg in av if isinstance(av, (tuple, list)) else (av,):
+        if isinstance(arg, sre_parse.SubPattern):
+            yield arg
+        elif isinstance(arg, (tuple, list)):
+            for subpattern in _subpatterns(arg):
+                yield subpattern
+
+
+def _is_unbounded(op, av):
+    return op in REPEATS and av[1] == sre_constants.MAXREPEAT
+
+
+def _nested_repeat(parsed):
+    '''Whether an unbounded repeat of the parsed pattern iterates over another one'''
+    for op, av in parsed:
+        if _is_unbounded(op, av) and _loops(av[2]):
+            return True
+        if any(_nested_repeat(subpattern) for subpattern in _subpatterns(av)):
+            return True
+    return False
+
+
+def _loops(parsed):
+    '''Whether a parsed pattern is made of an unbounded repeat and of items matching the empty string'''
+    found = False
+    state = getattr(parsed, 'state', None) or getattr(parsed, 'pattern', None)
+    for op, av in parsed:
+        if _is_unbounded(op, av) or op in GROUPS and any(_loops(subpattern) for subpattern in _subpatterns(av)):
+            found = True
+        elif sre_parse.SubPattern(state, [(op, av)]).getwidth()[0] > 0:
+            return False
+    return found
@@ -8,6 +8,7 @@ from collections import OrderedDict
 from inspect import getdoc
 from inspect import isclass
 from six.moves.urllib.parse import quote
+from six.moves.urllib.parse import unquote
 
 from six import iteritems
 from six import iterkeys
@@ -43,6 +44,8 @@ RE_PARAMS = re.compile(r'{([^{}]+)}')
 DEFAULT_RESPONSE_DESCRIPTION = 'Success'
 DEFAULT_RESPONSE = {'description': DEFAULT_RESPONSE_DESCRIPTION}
 
+DEFINITIONS_REF_PREFIX = '#/definitions/'
+
 
 def ref(model):
     '''Return a reference to model in definitions'''
@@ -55,6 +58,42 @@ def _v(value):
     return value() if callable(value) else value
 
 
+def doc_stamp(value):
+    '''
+    Identify the current state of a documentation value (eg. an ``__apidoc__`` dict):
+    nested dicts and lists are walked, models and fields are identified by their stamp.
+    '''
+    if isinstance(value, type):
+        return value
+    stamp = getattr(value, '_stamp', None)
+    if stamp is not None:
+        return id(value), stamp()
+    if isinstance(value, dict):
+        return tuple((key, doc_stamp(item)) for key, item in iteritems(value))
+    if isinstance(value, (list, tuple)):
+        return tuple(doc_stamp(item) for item in value)
+    return value if isinstance(value, Hashable) else id(value)
+
+
+def namespace_stamp(ns, models=()):
+    '''
+    Identify the current state of the documentation of a namespace: the ``__apidoc__`` of its
+    resources and of their methods, and the given models (those its fragment refers to).
+    A cached fragment is still valid as long as the stamp is the same.
+
+    :param Namespace ns: The namespace
+    :param models: The models (or dicts of fields) of the namespace fragment
+    '''
+    docs = []
+    for resource, url, _ in ns.resources:
+        docs.append((resource, url, doc_stamp(getattr(resource, '__apidoc__', None))))
+        for method in get_resource_http_methods(resource):
+            method_impl = getattr(resource, method)
+            method_impl = getattr(method_impl, '__func__', method_impl)
+            docs.append(doc_stamp(getattr(method_impl, '__apidoc__', None)))
+    return tuple(docs), tuple(doc_stamp(model) for model in models)
+
+
 def extract_path(path):
     '''
     Transform a wsgiservice URL pattern in a Swagger one.
@@ -96,6 +135,87 @@ def _param_to_header(param):
     return param
 
 
+def collect_references(data):
+    '''
+    Collect the names of the definitions referenced (``$ref``) anywhere in a specification part.
+
+    :param data: A serialized specification part
+    :rtype: set
+    '''
+    references = set()
+    pending = [data]
+    while pending:
+        current = pending.pop()
+        if isinstance(current, dict):
+            reference = current.get('$ref')
+            if isinstance(reference, string_types) and reference.startswith(DEFINITIONS_REF_PREFIX):
+                references.add(unquote(reference[len(DEFINITIONS_REF_PREFIX):]))
+            pending.extend(itervalues(current))
+        elif isinstance(current, (list, tuple)):
+            pending.extend(current)
+    return references
+
+
+def filter_operations(paths, tags):
+    '''
+    Keep only the operations tagged with one of the given tags.
+
+    :param dict paths: Serialized specification paths
+    :param tags: The tags to keep
+    :rtype: dict
+    '''
+    tags = set(tags)
+    filtered = {}
+    for url, path in iteritems(paths):
+        if not path:
+            continue
+        operations = dict(
+            (method, operation) for method, operation in iteritems(path)
+            if method != 'parameters' and tags.intersection(operation.get('tags', []))
+        )
+        if operations:
+            if 'parameters' in path:
+                operations['parameters'] = path['parameters']
+            filtered[url] = operations
+    return filtered
+
+
+def partial_specs(specs, paths):
+    '''
+    Restrict a full specification to some of its paths.
+
+    The resulting specification is self-contained: it holds the transitive closure of the
+    definitions referenced by these paths and only the tags they use.
+
+    :param dict specs: The full serialized specification
+    :param dict paths: The paths to keep
+    :rtype: dict
+    '''
+    definitions = specs.get('definitions', {})
+    needed = set()
+    pending = collect_references(paths)
+    while pending:
+        name = pending.pop()
+        if name in needed or name not in definitions:
+            continue
+        needed.add(name)
+        pending |= collect_references(definitions[name])
+
+    used_tags = set()
+    for path in itervalues(paths):
+        for method, operation in iteritems(path or {}):
+            if method != 'parameters':
+                used_tags.update(operation.get('tags', []))
+
+    partial = dict(specs)
+    partial.update({
+        'paths': not_none_sorted(paths),
+        'definitions': dict((name, definitions[name]) for name in needed) or None,
+        'tags': [tag for tag in specs.get('tags', []) if tag['name'] in used_tags],
+    })
+    return not_none(partial)
+
+
 def parse_docstring(obj):
     '''
     Parses a resource/method doc-string
@@ -128,10 +248,14 @@ class Swagger(object):
         self.api = api
         self._registered_models = {}
 
-    def as_dict(self, show_internal=False):
+    def as_dict(self, show_internal=False, fragments=None):
         '''
         Output the specification as a serializable ``dict``.
 
+        :param bool show_internal: Include non-public namespaces and resources
+        :param dict fragments: An optional cache of namespace fragments (as produced by
+            :meth:`serialize_namespace`) keyed by ``(namespace, show_internal)``.
+            Missing fragments are serialized and stored into it.
         :returns: the full Swagger specification in a serializable format
         :rtype: dict
         '''
@@ -158,6 +282,7 @@ class Swagger(object):
                 infos['license']['url'] = _v(self.api.license_url)
 
         paths = {}
+        definitions = {}
         tags = self.extract_tags(self.api)
 
         # register errors
@@ -166,11 +291,13 @@ class Swagger(object):
         for ns in self.api.namespaces:
             if not ns.public and not show_internal:
                 continue
-            for resource, url, kwargs in ns.resources:
-                if not resource.public and not show_internal:
-                    continue
-                else:
-                    paths[extract_path(url)] = self.serialize_resource(ns, resource, url, kwargs)
+            fragment = fragments.get((ns, show_internal)) if fragments is not None else None
+            if fragment is None:
+                fragment = self.serialize_namespace(ns, show_internal)
+                if fragments is not None:
+                    fragments[(ns, show_internal)] = fragment
+            paths.update(fragment['paths'])
+            definitions.update(fragment['definitions'])
 
         specs = {
             'swagger': '2.0',
@@ -182,12 +309,42 @@ class Swagger(object):
             'securityDefinitions': self.api.authorizations or None,
             'security': self.security_requirements(self.api.security) or None,
             'tags': tags,
-            'definitions': self.serialize_definitions() or None,
+            'definitions': definitions or None,
             'responses': responses or None,
             'host': None,
         }
         return not_none(specs)
 
+    def serialize_namespace(self, ns, show_internal=False):
+        '''
+        Serialize a single namespace as a specification fragment.
+
+        :param Namespace ns: The namespace to serialize
+        :param bool show_internal: Include non-public resources
+        :returns: the namespace ``paths``, the ``definitions`` they reference, the ``models``
+            they come from and the namespace ``stamp`` (see :func:`namespace_stamp`)
+        :rtype: dict
+        '''
+        registered_models, self._registered_models = self._registered_models, {}
+        try:
+            paths = {}
+            for resource, url, kwargs in ns.resources:
+                if not resource.public and not show_internal:
+                    continue
+                paths[extract_path(url)] = self.serialize_resource(ns, resource, url, kwargs)
+            definitions = self.serialize_definitions()
+            models = tuple(itervalues(self._registered_models))
+        finally:
+            registered_models.update(self._registered_models)
+            self._registered_models = registered_models
+        return {
+            'paths': paths,
+            'definitions': definitions,
+            'models': models,
+            # Serializing updates the resources documentation: stamp it afterwards
+            'stamp': namespace_stamp(ns, models),
+        }
+
     def extract_tags(self, api):
         tags = []
         by_name = {}
@@ -348,6 +505,7 @@ class Swagger(object):
     def parameters_for(self, doc):
         params = []
         for name, param in iteritems(doc['params']):
+            param = dict(param)  # params are shared with the decorated objects documentation
             param['name'] = name
             if 'type' not in param and 'schema' not in param:
                 param['type'] = 'string'
@@ -2,18 +2,30 @@
 from __future__ import unicode_literals
 
 import re
+import threading
 
 from collections import OrderedDict
-from copy import deepcopy
+from copy import copy
 from six.moves.urllib.parse import quote
 
+from six import exec_
 from six import iteritems
 
+try:
+    from inspect import getfullargspec as getargspec
+except ImportError:  # Python 2
+    from inspect import getargspec
+
 
 FIRST_CAP_RE = re.compile('(.)([A-Z][a-z]+)')
 ALL_CAP_RE = re.compile('([a-z0-9])([A-Z])')
 
-__all__ = ('merge', 'camel_to_dash', 'default_id', 'not_none', 'not_none_sorted', 'format_definition_reference', 'format_definition_key')
+__all__ = ('merge', 'camel_to_dash', 'default_id', 'not_none', 'not_none_sorted', 'format_definition_reference',
+           'format_definition_key', 'LRUCache', 'wraps_with_signature', 'touch_documentation',
+           'documentation_generation')
+
+#: Incremented on each change of a documented object (see :func:`touch_documentation`)
+_documentation_generation = [0]
 
 
 def merge(first, second):
@@ -23,6 +35,10 @@ def merge(first, second):
     Second dictionnary values will take precedance over those from the first one.
     Nested dictionnaries are merged too.
 
+    Neither input is modified: only the dictionnaries along the merged keys are copied,
+    all the other values are shared between the inputs and the result (which must then
+    not be modified in depth).
+
     :param dict first: The first dictionnary
     :param dict second: The second dictionnary
     :return: the resulting merged dictionnary
@@ -30,15 +46,67 @@ def merge(first, second):
     '''
     if not isinstance(second, dict):
         return second
-    result = deepcopy(first)
+    result = copy(first)
     for key, value in iteritems(second):
         if key in result and isinstance(result[key], dict):
                 result[key] = merge(result[key], value)
         else:
-            result[key] = deepcopy(value)
+            result[key] = value
     return result
 
 
+def wraps_with_signature(wrapped, wrapper):
+    '''
+    Build a function with the exact signature of ``wrapped`` calling ``wrapper`` with its arguments.
+
+    Unlike :func:`functools.wraps`, the arguments seen through introspection are the wrapped
+    function ones, as wsgiservice relies on them to pass the request parameters to a method.
+
+    :param callable wrapped: The function whose signature and attributes are kept
+    :param callable wrapper: The function actually called (with the same arguments)
+    :return: the signature preserving wrapper
+    :rtype: function
+    '''
+    spec = getargspec(wrapped)
+    defaults = spec.defaults or ()
+    offset = len(spec.args) - len(defaults)
+    params = [
+        arg if index < offset else '{0}=__defaults__[{1}]'.format(arg, index - offset)
+        for index, arg in enumerate(spec.args)
+    ]
+    arguments = list(spec.args)
+    if spec.varargs:
+        params.append('*' + spec.varargs)
+        arguments.append('*' + spec.varargs)
+    kwonlyargs = getattr(spec, 'kwonlyargs', None) or []
+    if kwonlyargs:
+        if not spec.varargs:
+            params.append('*')
+        kwonlydefaults = spec.kwonlydefaults or {}
+        for arg in kwonlyargs:
+            params.append('{0}=__kwdefaults__[{1!r}]'.format(arg, str(arg)) if arg in kwonlydefaults else arg)
+            arguments.append('{0}={0}'.format(arg))
+    varkw = getattr(spec, 'varkw', None) or getattr(spec, 'keywords', None)
+    if varkw:
+        params.append('**' + varkw)
+        arguments.append('**' + varkw)
+
+    source = 'def wrapper({0}):\n    return __wrapper__({1})\n'.format(', '.join(params), ', '.join(arguments))
+    namespace = {
+        '__wrapper__': wrapper,
+        '__defaults__': defaults,
+        '__kwdefaults__': getattr(spec, 'kwonlydefaults', None),
+    }
+    exec_(source, namespace)
+    function = namespace['wrapper']
+    function.__name__ = wrapped.__name__
+    function.__doc__ = wrapped.__doc__
+    function.__module__ = wrapped.__module__
+    function.__dict__.update(wrapped.__dict__)
+    function.__wrapped__ = wrapped
+    return function
+
+
 def camel_to_dash(value):
     '''
     Transform a CamelCase string into a low_dashed one
@@ -100,3 +168,56 @@ def format_definition_reference(definition_name):
 def format_definition_key(definition_name):
     """See format_definition_reference function description for context"""
     return str_to_pascal_case(definition_name)
+
+
+def touch_documentation():
+    '''
+    Record a change of a documented object (a model or an ``__apidoc__``):
+    the APIs look for stale cached specifications only once something changed.
+    '''
+    _documentation_generation[0] += 1
+
+
+def documentation_generation():
+    '''The number of documented object changes so far (see :func:`touch_documentation`)'''
+    return _documentation_generation[0]
+
+
+class LRUCache(object):
+    '''
+    A thread-safe mapping bounded in size, discarding the least recently used entries first.
+
+    :param int maxsize: The maximum number of entries to keep
+    '''
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        '''Return the value for key (marking it as recently used) or default'''
+        with self._lock:
+            try:
+                value = self._data.pop(key)
+            except KeyError:
+                return default
+            self._data[key] = value
+            return value
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = value
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
@@ -0,0 +1,549 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import threading
+from collections import OrderedDict
+from decimal import Decimal
+
+from jsonschema import Draft4Validator, RefResolver
+from jsonschema.exceptions import RefResolutionError
+from six import exec_, integer_types, iteritems, itervalues, string_types
+from wsgiservice.exceptions import ResponseException
+
+from wsgiservice_restplus.fields import List, Nested, Polymorph, instance
+from wsgiservice_restplus.model import Model
+from wsgiservice_restplus.patterns import register as register_pattern
+from wsgiservice_restplus.utils import format_definition_key, getargspec, wraps_with_signature
+
+__all__ = (
+    'compile_validator', 'validated', 'collected', 'PayloadValidator', 'PAYLOAD_ERROR_MESSAGE',
+    'PARAMETERS_ERROR_MESSAGE', 'PAYLOAD_VALIDATOR_ENGINE',
+    'compile_schema', 'CompiledValidator', 'SchemaSourceGenerator', 'UnsupportedSchema',
+)
+
+#: The message of the 400 responses to invalid payloads
+PAYLOAD_ERROR_MESSAGE = 'Input payload validation failed'
+#: The message of the 400 responses to invalid collection parameters
+PARAMETERS_ERROR_MESSAGE = 'Input parameters validation failed'
+
+#: The Python types of the JSON schema types (booleans are neither integers nor numbers)
+JSON_TYPES = {
+    'string': string_types,
+    'integer': integer_types,
+    'number': integer_types + (float, Decimal),
+    'boolean': (bool,),
+    'object': (dict,),
+    'array': (list,),
+    'null': (type(None),),
+}
+
+#: The engine of the payload validators when the API doesn't set one
+PAYLOAD_VALIDATOR_ENGINE = 'compiled'
+
+#: The name of the models wrapping the dicts of fields given as payload models
+PAYLOAD_MODEL_NAME = 'Payload'
+
+#: The schema types of the form values converted before validation (they are all strings)
+CONVERTED_TYPES = frozenset(('integer', 'number', 'boolean'))
+
+
+def compile_validator(model, format_checker=None, engine=PAYLOAD_VALIDATOR_ENGINE):
+    '''
+    Get the payload validator of a model (compiled once and cached until the schema of the model,
+    or of one of the models it refers to, changes).
+
+    :param Model model: the model
+    :param FormatChecker format_checker: An optional format checker
+    :param str engine: The validator engine (one of :data:`~wsgiservice_restplus.model.VALIDATOR_ENGINES`)
+    :rtype: PayloadValidator
+    '''
+    validator = model._payload_validator
+    if (validator is None or validator.format_checker is not format_checker or validator.engine != engine
+            or not validator.is_valid()):
+        validator = model._payload_validator = PayloadValidator(model, format_checker, engine)
+    return validator
+
+
+def validated(func, models, namespace=None):
+    '''
+    Wrap a resource method to validate the request payload against models before calling it.
+
+    The payloads are validated with the format checker and the validator engine of the API
+    the namespace is registered in, by validators generated as Python source when the API
+    doesn't set an engine (see :data:`PAYLOAD_VALIDATOR_ENGINE`).
+    Invalid payloads are answered with a 400 response listing the errors by field path
+    (in the :meth:`Model.format_error` key format).
+
+    :param func: the resource method to wrap
+    :param list models: the models (or dicts of fields) the payload must match
+    :param Namespace namespace: the namespace of the resource
+    '''
+    models = [model if isinstance(model, Model) else Model(PAYLOAD_MODEL_NAME, model) for model in models]
+
+    def wrapper(*args, **kwargs):
+        resource = args[0]
+        apis = getattr(namespace, 'apis', None)
+        format_checker = apis[0].format_checker if apis else None
+        engine = apis and apis[0].validator_engine or PAYLOAD_VALIDATOR_ENGINE
+        convert = not is_json(resource.request)
+        errors = {}
+        for model in models:
+            errors.update(compile_validator(model, format_checker, engine)(resource.data, convert))
+        if errors:
+            resource.response.status = 400
+            resource.response.body_raw = {'message': PAYLOAD_ERROR_MESSAGE, 'errors': errors}
+            raise ResponseException(resource.response)
+        return func(*args, **kwargs)
+
+    return wraps_with_signature(func, wrapper)
+
+
+def collected(func, name, parse, multi=False):
+    '''
+    Wrap a resource method to parse one of its parameters as a collection (a list).
+
+    The ``multi`` collection format takes every occurrence of a query string parameter,
+    as wsgiservice only passes the last one. The other formats split the value wsgiservice passes.
+
+    Invalid collections are answered with a 400 response listing the error by parameter name,
+    whatever the collection format.
+
+    :param func: the resource method to wrap
+    :param str name: the parameter name (one of the method arguments)
+    :param callable parse: parses the value or the list of values (eg. :class:`~wsgiservice_restplus.inputs.delimited`)
+    :param bool multi: whether to parse every occurrence of the query string parameter
+    '''
+    index = getargspec(func).args.index(name)
+
+    def wrapper(*args, **kwargs):
+        resource = args[0]
+        if multi:
+            value = resource.request.GET.getall(name) or None
+        else:
+            value = args[index] if len(args) > index else None
+        if value is not None:
+            try:
+                value = parse(value)
+            except ValueError as e:
+                resource.response.status = 400
+                resource.response.body_raw = {'message': PARAMETERS_ERROR_MESSAGE, 'errors': {name: str(e)}}
+                raise ResponseException(resource.response)
+            args = args[:index] + (value,) + args[index + 1:]
+        return func(*args, **kwargs)
+
+    return wraps_with_signature(func, wrapper)
+
+
+def is_json(request):
+    '''Whether the request payload is a JSON document (and not form or query string values)'''
+    content_type = request.headers.get('Content-Type') or ''
+    return content_type.split(';')[0].strip() == 'application/json'
+
+
+def type_error(value, expected):
+    return '%r is not of type %r' % (value, expected)
+
+
+def equal(one, two):
+    '''JSON equality: booleans are not equal to numbers'''
+    return isinstance(one, bool) == isinstance(two, bool) and one == two
+
+
+def is_multiple(value, divisor):
+    '''Whether a number is a multiple of another one (as checked by jsonschema)'''
+    if isinstance(divisor, float) or isinstance(value, float):
+        quotient = float(value) / float(divisor)
+        try:
+            return int(quotient) == quotient
+        except OverflowError:  # Infinite quotient
+            return False
+    return not value % divisor
+
+
+def unique(items):
+    '''Whether all the items of a JSON array are distinct'''
+    try:
+        keys = [(isinstance(item, bool), item) for item in items]
+        return len(set(keys)) == len(keys)
+    except TypeError:  # Unhashable items
+        for index, item in enumerate(items):
+            if any(equal(item, other) for other in items[index + 1:]):
+                return False
+        return True
+
+
+def referenced_models(model):
+    '''The models a model refers to (its ancestors and the models of its nested fields), itself included'''
+    models = OrderedDict()
+    pending = [model]
+    while pending:
+        current = pending.pop()
+        if not isinstance(current, Model) or id(current) in models:
+            continue
+        models[id(current)] = current
+        pending.extend(current.__parents__)
+        for field in itervalues(current):
+            pending.extend(field_models(field))
+    return list(models.values())
+
+
+def model_fields(model):
+    '''The fields of a model and those of its ancestors, without copying them'''
+    fields = OrderedDict(model)
+    for parent in model.__parents__:
+        fields.update(model_fields(parent))
+    return fields
+
+
+def field_models(field):
+    '''The models a field refers to'''
+    field = instance(field)
+    if isinstance(field, Polymorph):
+        return [field.model] + list(itervalues(field.mapping))
+    if isinstance(field, Nested):
+        return [field.model]
+    if isinstance(field, List):
+        return field_models(field.container)
+    return []
+
+
+class PayloadValidator(object):
+    '''
+    The payload validator of a model: a validator of the model schema (generated as Python source
+    or jsonschema's, depending on the engine) resolving the references to the models it refers to,
+    with the conversion of the form values of the number and boolean fields.
+
+    Calling it returns the errors of a payload, as a dict of messages by field path.
+    '''
+    __slots__ = ('model', 'format_checker', 'engine', 'schemas', 'definitions', 'converters', '_local')
+
+    def __init__(self, model, format_checker=None, engine=PAYLOAD_VALIDATOR_ENGINE):
+        self.model = model
+        self.format_checker = format_checker
+        self.engine = engine
+        #: The ``(model, schema)`` pairs the validator was compiled from
+        self.schemas = tuple((m, m.__schema__) for m in referenced_models(model))
+        self.definitions = {
+            'definitions': dict((format_definition_key(m.name), schema) for m, schema in self.schemas),
+        }
+        #: The converters of the form values, by field name
+        self.converters = tuple(self.form_converters())
+        # Resolving references keeps state in the resolver: one resolver (and validator) per thread
+        self._local = threading.local()
+
+    def form_converters(self):
+        for name, field in iteritems(model_fields(self.model)):
+            field = instance(field)
+            func = field.valid_params.get('convert') if hasattr(field, 'valid_params') else None
+            expected = field.__schema__.get('type')
+            if func and expected in CONVERTED_TYPES:
+                yield name, func, expected
+
+    @property
+    def resolver(self):
+        resolver = getattr(self._local, 'resolver', None)
+        if resolver is None:
+            resolver = self._local.resolver = RefResolver.from_schema(self.definitions)
+        return resolver
+
+    @property
+    def validator(self):
+        validator = getattr(self._local, 'validator', None)
+        if validator is None:
+            schema = self.schemas[0][1]
+            if self.engine == 'compiled':
+                validator = compile_schema(schema, resolver=self.resolver, format_checker=self.format_checker)
+            else:
+                validator = Draft4Validator(schema, resolver=self.resolver, format_checker=self.format_checker)
+            self._local.validator = validator
+        return validator
+
+    def __call__(self, data, convert=False):
+        '''
+        Validate a payload.
+
+        :param dict data: the payload
+        :param bool convert: convert the (string) form values of the number and boolean fields first
+        :rtype: OrderedDict
+        '''
+        errors = OrderedDict()
+        if convert and isinstance(data, dict):
+            data = dict(data)
+            for name, func, expected in self.converters:
+                value = data.get(name)
+                if isinstance(value, string_types):
+                    try:
+                        data[name] = func(value)
+                    except (TypeError, ValueError):
+                        errors[name] = type_error(value, expected)
+                        del data[name]
+        for error in self.validator.iter_errors(data):
+            key, message = self.model.format_error(error)
+            errors.setdefault(key, message)
+        return errors
+
+    def is_valid(self):
+        '''Whether none of the schemas the validator was compiled from has changed'''
+        return all(model.__schema__ is schema for model, schema in self.schemas)
+
+
+#: The JSON schema keywords translated by :class:`SchemaSourceGenerator`
+SOURCE_KEYWORDS = frozenset((
+    '$ref', 'allOf', 'type', 'enum', 'format', 'required', 'properties', 'items',
+    'minLength', 'maxLength', 'pattern', 'minimum', 'maximum', 'exclusiveMinimum', 'exclusiveMaximum',
+    'multipleOf', 'minItems', 'maxItems', 'uniqueItems',
+))
+
+#: The JSON schema keywords without effect on validation
+ANNOTATION_KEYWORDS = frozenset((
+    'title', 'description', 'default', 'example', 'readOnly', 'discriminator', 'definitions', 'id', '$schema',
+))
+
+#: The Python expressions of the JSON schema types checks
+TYPE_CHECKS = {
+    'string': 'isinstance({0}, string_types)',
+    'integer': '(isinstance({0}, integer_types) and not isinstance({0}, bool))',
+    'number': '(isinstance({0}, number_types) and not isinstance({0}, bool))',
+    'boolean': 'isinstance({0}, bool)',
+    'object': 'isinstance({0}, dict)',
+    'array': 'isinstance({0}, list)',
+    'null': '{0} is None',
+}
+
+_missing = object()
+
+
+class UnsupportedSchema(Exception):
+    '''Raised when a schema can't be translated into Python source'''
+    pass
+
+
+def compile_schema(schema, resolver=None, format_checker=None):
+    '''
+    Get a validator of a JSON schema generated as Python source (see :class:`CompiledValidator`),
+    or a :class:`~jsonschema.Draft4Validator` when the schema uses keywords outside of
+    the Draft 4 subset the fields generate.
+
+    :param dict schema: The JSON schema
+    :param RefResolver resolver: An optional JSON schema reference resolver
+    :param FormatChecker format_checker: An optional format checker
+    '''
+    try:
+        check, source = SchemaSourceGenerator(resolver, format_checker).generate(schema)
+    except (UnsupportedSchema, RefResolutionError):
+        return Draft4Validator(schema, resolver=resolver, format_checker=format_checker)
+    return CompiledValidator(schema, check, source, resolver=resolver, format_checker=format_checker)
+
+
+class CompiledValidator(object):
+    '''
+    A JSON schema validator generated as Python source: a function returning whether a value
+    is valid, with the keywords of the schema (and of the schemas it refers to) inlined.
+
+    It has the interface of a :class:`~jsonschema.Draft4Validator`. Valid values are only checked
+    by the generated function: the errors of invalid ones are listed by a ``Draft4Validator``
+    (built on the first invalid value), so they are exactly those of jsonschema.
+    '''
+    __slots__ = ('schema', 'check', 'source', 'resolver', 'format_checker', '_fallback')
+
+    def __init__(self, schema, check, source, resolver=None, format_checker=None):
+        self.schema = schema
+        self.check = check
+        #: The generated source (for debugging purpose)
+        self.source = source
+        self.resolver = resolver
+        self.format_checker = format_checker
+        self._fallback = None
+
+    @property
+    def fallback(self):
+        if self._fallback is None:
+            self._fallback = Draft4Validator(self.schema, resolver=self.resolver, format_checker=self.format_checker)
+        return self._fallback
+
+    def is_valid(self, instance):
+        return self.check(instance)
+
+    def iter_errors(self, instance):
+        if self.check(instance):
+            return iter(())
+        return self.fallback.iter_errors(instance)
+
+    def validate(self, instance):
+        for error in self.iter_errors(instance):
+            raise error
+
+
+class SchemaSourceGenerator(object):
+    '''
+    Translates a JSON schema into the source of Python functions returning whether a value is valid.
+
+    Subschemas are inlined, except the referenced ones (one function each, so recursive
+    references are generated once) and the array items ones (checked in a loop).
+
+    :raises UnsupportedSchema: when the schema uses keywords outside of :data:`SOURCE_KEYWORDS`
+    '''
+
+    def __init__(self, resolver=None, format_checker=None):
+        self.resolver = resolver
+        self.format_checker = format_checker
+        self.namespace = {
+            'string_types': string_types,
+            'integer_types': integer_types,
+            'number_types': JSON_TYPES['number'],
+            '_missing': _missing,
+            '_equal': equal,
+            '_unique': unique,
+            '_is_multiple': is_multiple,
+        }
+        if format_checker is not None:
+            self.namespace['_conforms'] = format_checker.conforms
+        self.functions = {}
+        self.pending = []
+        self.lines = []
+        self.variables = 0
+
+    def generate(self, schema):
+        '''
+        :return: The root function and the source of the functions
+        :rtype: tuple
+        '''
+        name = self.function(schema)
+        while self.pending:
+            self.generate_function(*self.pending.pop())
+        source = '\n'.join(self.lines) + '\n'
+        exec_(compile(source, '<schema validator>', 'exec'), self.namespace)
+        return self.namespace[name], source
+
+    def function(self, schema, key=None):
+        '''Get the name of the function checking a schema (generated later)'''
+        key = id(schema) if key is None else key
+        if key not in self.functions:
+            self.functions[key] = 'check_{0}'.format(len(self.functions))
+            self.pending.append((self.functions[key], schema))
+        return self.functions[key]
+
+    def constant(self, value):
+        '''Get the name of a constant of the generated source'''
+        name = '_c{0}'.format(len(self.namespace))
+        self.namespace[name] = value
+        return name
+
+    def variable(self):
+        self.variables += 1
+        return 'v{0}'.format(self.variables)
+
+    def reference(self, ref):
+        '''Get the name of the function checking a referenced schema'''
+        if self.resolver is None:
+            raise UnsupportedSchema('Unable to resolve {0} without resolver'.format(ref))
+        if hasattr(self.resolver, 'resolve'):
+            url, resolved = self.resolver.resolve(ref)
+        else:
+            with self.resolver.resolving(ref) as resolved:
+                url = ref
+        return self.function(resolved, url)
+
+    def generate_function(self, name, schema):
+        self.lines.append('def {0}(value):'.format(name))
+        self.lines.extend(self.checks(schema, 'value', '    '))
+        self.lines.append('    return True')
+
+    def checks(self, schema, var, indent):
+        '''The source lines (returning ``False``) checking a variable value against a schema'''
+        if not isinstance(schema, dict):
+            raise UnsupportedSchema('Unsupported schema: {0!r}'.format(schema))
+        lines = []
+
+        def fail(condition, guard=None):
+            condition = '{0} and {1}'.format(guard, condition) if guard else condition
+            lines.append('{0}if {1}:'.format(indent, condition))
+            lines.append('{0}    return False'.format(indent))
+
+        if '$ref' in schema:
+            # Draft 4: the other keywords of a reference are ignored
+            fail('not {0}({1})'.format(self.reference(schema['$ref']), var))
+            return lines
+
+        for keyword in schema:
+            if keyword not in SOURCE_KEYWORDS and keyword not in ANNOTATION_KEYWORDS and not keyword.startswith('x-'):
+                raise UnsupportedSchema('Unsupported keyword: {0}'.format(keyword))
+
+        types = schema.get('type')
+        types = [types] if isinstance(types, string_types) else types or []
+        if any(t not in TYPE_CHECKS for t in types):
+            raise UnsupportedSchema('Unsupported type: {0!r}'.format(types))
+        if types:
+            condition = ' or '.join(TYPE_CHECKS[t].format(var) for t in types)
+            fail('not {0}'.format(condition if len(types) == 1 else '({0})'.format(condition)))
+        known = types[0] if len(types) == 1 else None
+
+        def guard(*kinds):
+            # Keywords only apply to the values of their types
+            return None if known in kinds else TYPE_CHECKS[kinds[-1]].format(var)
+
+        for subschema in schema.get('allOf', ()):
+            lines.extend(self.checks(subschema, var, indent))
+
+        if 'enum' in schema:
+            enum = schema['enum']
+            if all(isinstance(item, string_types) for item in enum):
+                fail('not (isinstance({0}, string_types) and {0} in {1})'.format(var, self.constant(frozenset(enum))))
+            else:
+                fail('not any(_equal({0}, item) for item in {1})'.format(var, self.constant(list(enum))))
+        if 'format' in schema and self.format_checker is not None:
+            fail('not _conforms({0}, {1})'.format(var, self.constant(schema['format'])))
+
+        if schema.get('minLength') is not None:
+            fail('len({0}) < {1}'.format(var, self.constant(schema['minLength'])), guard('string'))
+        if schema.get('maxLength') is not None:
+            fail('len({0}) > {1}'.format(var, self.constant(schema['maxLength'])), guard('string'))
+        if schema.get('pattern') is not None:
+            search = self.constant(register_pattern(schema['pattern']).search)
+            fail('not {0}({1})'.format(search, var), guard('string'))
+
+        if schema.get('minimum') is not None:
+            operator = '<=' if schema.get('exclusiveMinimum') else '<'
+            fail('{0} {1} {2}'.format(var, operator, self.constant(schema['minimum'])), guard('integer', 'number'))
+        if schema.get('maximum') is not None:
+            operator = '>=' if schema.get('exclusiveMaximum') else '>'
+            fail('{0} {1} {2}'.format(var, operator, self.constant(schema['maximum'])), guard('integer', 'number'))
+        if schema.get('multipleOf') is not None:
+            divisor = self.constant(schema['multipleOf'])
+            fail('not _is_multiple({0}, {1})'.format(var, divisor), guard('integer', 'number'))
+
+        if schema.get('minItems') is not None:
+            fail('len({0}) < {1}'.format(var, self.constant(schema['minItems'])), guard('array'))
+        if schema.get('maxItems') is not None:
+            fail('len({0}) > {1}'.format(var, self.constant(schema['maxItems'])), guard('array'))
+        if schema.get('uniqueItems'):
+            fail('not _unique({0})'.format(var), guard('array'))
+        if 'items' in schema:
+            if not isinstance(schema['items'], dict):
+                raise UnsupportedSchema('Unsupported items: {0!r}'.format(schema['items']))
+            item = self.variable()
+            check = self.function(schema['items'])
+            condition = 'not all({0}({1}) for {1} in {2})'.format(check, item, var)
+            fail(condition, guard('array'))
+
+        required = schema.get('required') or ()
+        properties = schema.get('properties') or {}
+        if required or properties:
+            block = []
+            for name in required:
+                block.append('{0}    if {1} not in {2}:'.format(indent, self.constant(name), var))
+                block.append('{0}        return False'.format(indent))
+            for name, subschema in iteritems(properties):
+                value = self.variable()
+                checks = self.checks(subschema, value, indent + '        ')
+                if checks:
+                    block.append('{0}    {1} = {2}.get({3}, _missing)'.format(indent, value, var, self.constant(name)))
+                    block.append('{0}    if {1} is not _missing:'.format(indent, value))
+                    block.extend(checks)
+            if block and known == 'object':
+                lines.extend(line[4:] for line in block)
+            elif block:
+                lines.append('{0}if isinstance({1}, dict):'.format(indent, var))
+                lines.extend(block)
+
+        return lines